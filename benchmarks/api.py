@@ -0,0 +1,207 @@
+"""Throughput and latency of the main API endpoints.
+
+Seeds ``--users`` x ``--todos`` rows, then reports req/s and p50/p95/p99
+(milliseconds) per scenario. Runs against a throwaway SQLite file unless
+``--database-url`` is given; that database is DROPPED and recreated, so
+only point it at a scratch Postgres::
+
+    python -m benchmarks.api
+    python -m benchmarks.api --database-url postgresql+psycopg://...
+
+``--save-baseline`` stores the summary under ``benchmarks/baselines`` and
+``--compare`` fails when a scenario's p95 regresses past ``--tolerance``.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.harness import (
+    PASSWORD,
+    app_client,
+    compare,
+    measure,
+    report,
+    save_baseline,
+    seed,
+)
+from fast_zero import ratelimit
+from fast_zero.routers.todos import todo_pages
+from fast_zero.security import create_access_token
+
+BASELINES = Path(__file__).parent / "baselines"
+
+LIST_FILTERS = {
+    "GET /todos/": {},
+    "GET /todos/?title": {"title": "re"},
+    "GET /todos/?description": {"description": "re"},
+    "GET /todos/?state": {"state": "done"},
+}
+CURSOR_PAGE_SIZE = 20
+
+
+async def walk_cursors(client, headers) -> list[tuple[dict, dict]]:
+    """``(headers, params)`` for every page past the first of each user.
+
+    The cursors are the ``next_cursor`` values the API hands out, so the
+    scenario seeks into the keyset at every depth of the list.
+    """
+    pages = []
+    for user_headers in headers:
+        params = {"limit": CURSOR_PAGE_SIZE}
+        while True:
+            response = await client.get(
+                "/todos/", params=params, headers=user_headers
+            )
+            next_cursor = response.json().get("next_cursor")
+            if not next_cursor:
+                break
+            params = {"limit": CURSOR_PAGE_SIZE, "cursor": next_cursor}
+            pages.append((user_headers, params))
+    return pages
+
+
+async def run(args, database_url: str):
+    engine = create_async_engine(database_url)
+    users = await seed(engine, args.users, args.todos)
+    headers = [
+        {
+            "Authorization": "Bearer "
+            + create_access_token({"sub": u.username, "uid": u.id})
+        }
+        for u in users
+    ]
+    todo_ids = list(range(1, args.users * args.todos + 1))
+    random.Random(0).shuffle(todo_ids)
+
+    def owner(todo_id):
+        return headers[(todo_id - 1) // args.todos]
+
+    # Every in-process request comes from the same address; the login
+    # scenario measures hashing, not 429s.
+    ratelimit.login_username_limiter.burst = float("inf")
+    ratelimit.login_ip_limiter.burst = float("inf")
+
+    results = []
+    async with app_client(engine) as client:
+
+        def login(i):
+            return client.post(
+                "/auth/token",
+                data={
+                    "username": users[i % len(users)].username,
+                    "password": PASSWORD,
+                },
+            )
+
+        results.append(
+            await measure(
+                "POST /auth/token",
+                login,
+                max(args.requests // 10, args.concurrency),
+                args.concurrency,
+            )
+        )
+
+        # The list scenarios measure the queries: todo_pages would otherwise
+        # answer every repeat of the same request (see benchmarks.caching).
+        for name, params in LIST_FILTERS.items():
+
+            def list_todos(i, params=params):
+                todo_pages.clear()
+                return client.get(
+                    "/todos/", params=params, headers=headers[i % len(users)]
+                )
+
+            results.append(
+                await measure(
+                    name, list_todos, args.requests, args.concurrency
+                )
+            )
+
+        pages = await walk_cursors(client, headers)
+
+        def list_page(i):
+            todo_pages.clear()
+            page_headers, params = pages[i % len(pages)]
+            return client.get("/todos/", params=params, headers=page_headers)
+
+        results.append(
+            await measure(
+                "GET /todos/?cursor",
+                list_page,
+                args.requests,
+                args.concurrency,
+            )
+        )
+
+        def patch(i):
+            todo_id = todo_ids[i]
+            return client.patch(
+                f"/todos/{todo_id}",
+                json={"state": "doing"},
+                headers=owner(todo_id),
+            )
+
+        def delete(i):
+            todo_id = todo_ids[-i - 1]
+            return client.delete(f"/todos/{todo_id}", headers=owner(todo_id))
+
+        results.append(
+            await measure(
+                "PATCH /todos/{id}", patch, args.requests, args.concurrency
+            )
+        )
+        results.append(
+            await measure(
+                "DELETE /todos/{id}", delete, args.requests, args.concurrency
+            )
+        )
+
+    await engine.dispose()
+    return results
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tmp}/db"
+        results = await run(args, database_url)
+
+    report(results)
+
+    backend = database_url.split(":", 1)[0].split("+", 1)[0]
+    baseline = BASELINES / f"api-{backend}.json"
+
+    if args.save_baseline:
+        save_baseline(baseline, results)
+        print(f"baseline saved to {baseline}")
+
+    if args.compare:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--todos", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args()
+
+    if args.requests * 2 > args.users * args.todos:
+        parser.error("need users * todos >= 2 * requests for PATCH/DELETE")
+
+    asyncio.run(main(args))
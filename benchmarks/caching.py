@@ -0,0 +1,72 @@
+"""CPU time of a polled ``GET /todos/`` page: rendered, cached, 304.
+
+Compares a page rendered from the database, the same page served from the
+serialized page cache, and a revalidation answered with ``304 Not
+Modified`` from the client's ``If-None-Match``::
+
+    python -m benchmarks.caching
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+from pathlib import Path
+from time import process_time
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.harness import PASSWORD, app_client, seed
+from fast_zero.events import broker
+from fast_zero.routers.todos import todo_pages
+
+
+async def main(args):
+    # One process sees every write, so the page cache and version tags are
+    # as safe here as with a shared broker.
+    broker.shared = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp)}/db")
+        (user,) = await seed(engine, users=1, todos=args.todos)
+
+        async with app_client(engine) as client:
+            response = await client.post(
+                "/auth/token",
+                data={"username": user.username, "password": PASSWORD},
+            )
+            headers = {
+                "Authorization": f"Bearer {response.json()['access_token']}"
+            }
+            url = f"/todos/?limit={args.todos}"
+            etag = (await client.get(url, headers=headers)).headers["ETag"]
+
+            modes = {
+                "rendered": headers,
+                "cached": headers,
+                "not_modified": {**headers, "If-None-Match": etag},
+            }
+            samples = {mode: [] for mode in modes}
+            for _ in range(args.requests):
+                for mode, mode_headers in modes.items():
+                    if mode == "rendered":
+                        todo_pages.clear()
+                    start = process_time()
+                    response = await client.get(url, headers=mode_headers)
+                    samples[mode].append((process_time() - start) * 1000)
+                    assert not response.is_error
+
+        await engine.dispose()
+
+    for mode, runs in samples.items():
+        print(
+            f"{mode:<13} rows={args.todos} "
+            f"cpu={statistics.median(runs):.2f}ms/request"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--todos", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,155 @@
+"""Shared pieces of the benchmark scripts.
+
+Benchmarks drive the real app in-process through httpx's ASGI transport,
+with ``get_session`` pointed at an engine owned by the benchmark, so the
+numbers include routing, validation, serialization and the database but
+no network.
+"""
+
+import asyncio
+import json
+import statistics
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from fast_zero.app import app
+from fast_zero.database import get_session
+from fast_zero.models import Todo, User, table_registry
+from fast_zero.security import get_password_hash
+from tests.factories import TodoFactory, UserFactory
+
+PASSWORD = "bench-secret"
+
+
+@dataclass
+class Result:
+    name: str
+    requests: int
+    seconds: float
+    latencies: list[float] = field(repr=False)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.seconds
+
+    def percentile(self, cut: int) -> float:
+        return statistics.quantiles(self.latencies, n=100)[cut - 1]
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "rps": round(self.rps, 1),
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "p99": round(self.percentile(99), 2),
+        }
+
+
+async def seed(engine: AsyncEngine, users: int, todos: int) -> list[User]:
+    """Recreate the schema and insert ``users`` x ``todos`` rows."""
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    password = await get_password_hash(PASSWORD)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        db_users = UserFactory.build_batch(users, password=password)
+        session.add_all(db_users)
+        await session.flush()
+
+        for user in db_users if todos else ():
+            rows = TodoFactory.build_batch(todos, user_id=user.id)
+            await session.execute(
+                insert(Todo),
+                [
+                    {
+                        "title": row.title,
+                        "description": row.description,
+                        "state": row.state,
+                        "user_id": row.user_id,
+                    }
+                    for row in rows
+                ],
+            )
+        await session.commit()
+
+    return db_users
+
+
+@asynccontextmanager
+async def app_client(engine: AsyncEngine):
+    async def get_session_override():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+async def measure(name, call, requests: int, concurrency: int) -> Result:
+    """Issue ``requests`` calls of ``call(i)`` from ``concurrency`` workers.
+
+    Latencies are in milliseconds; non-2xx responses abort the run so a
+    broken scenario cannot pass for a fast one.
+    """
+    latencies = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = perf_counter()
+            response = await call(i)
+            latencies.append((perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return Result(name, requests, perf_counter() - start, latencies)
+
+
+def save_baseline(path: Path, results: list[Result]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {result.name: result.summary() for result in results}
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(results: list[Result], path: Path, tolerance: float) -> list[str]:
+    """Scenarios whose p95 got slower than the baseline by over tolerance."""
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    regressions = []
+
+    for result in results:
+        expected = baseline.get(result.name)
+        if expected and result.percentile(95) > expected["p95"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{result.name}: p95 {result.percentile(95):.2f}ms "
+                f"> baseline {expected['p95']:.2f}ms"
+            )
+
+    return regressions
+
+
+def report(results: list[Result]):
+    print(f"{'scenario':<28}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for result in results:
+        summary = result.summary()
+        print(
+            f"{result.name:<28}{summary['rps']:>9}"
+            f"{summary['p50']:>9}{summary['p95']:>9}{summary['p99']:>9}"
+        )
@@ -0,0 +1,92 @@
+"""Latency of ``GET /todos/`` while other clients are logging in.
+
+Drives the app in-process over the ASGI transport against a throwaway
+SQLite database. ``--inline-hashing`` runs Argon2 on the event loop, as the
+app did before hashing moved to a worker pool, to compare the two modes::
+
+    python -m benchmarks.login_load
+    python -m benchmarks.login_load --inline-hashing
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.harness import PASSWORD, app_client, seed
+from fast_zero import ratelimit, security
+
+
+async def run_inline(func, /, *args):
+    return func(*args)
+
+
+async def login_forever(client: AsyncClient, username: str, deadline):
+    while perf_counter() < deadline:
+        await client.post(
+            "/auth/token", data={"username": username, "password": PASSWORD}
+        )
+
+
+async def read_todos(client: AsyncClient, token: str, deadline: float):
+    latencies = []
+    headers = {"Authorization": f"Bearer {token}"}
+
+    while perf_counter() < deadline:
+        start = perf_counter()
+        await client.get("/todos/", headers=headers)
+        latencies.append((perf_counter() - start) * 1000)
+
+    return latencies
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp)}/db")
+        (user,) = await seed(engine, users=1, todos=args.todos)
+
+        # The point is to keep hashing busy, not to measure 429s.
+        ratelimit.login_username_limiter.burst = float("inf")
+        ratelimit.login_ip_limiter.burst = float("inf")
+
+        if args.inline_hashing:
+            security.hashing_pool.run = run_inline
+
+        async with app_client(engine) as client:
+            response = await client.post(
+                "/auth/token",
+                data={"username": user.username, "password": PASSWORD},
+            )
+            token = response.json()["access_token"]
+
+            deadline = perf_counter() + args.duration
+            latencies, *_ = await asyncio.gather(
+                read_todos(client, token, deadline),
+                *(
+                    login_forever(client, user.username, deadline)
+                    for _ in range(args.logins)
+                ),
+            )
+
+        await engine.dispose()
+
+    cuts = statistics.quantiles(latencies, n=100)
+    mode = "inline" if args.inline_hashing else "pool"
+    print(
+        f"hashing={mode} logins={args.logins} requests={len(latencies)} "
+        f"p50={cuts[49]:.1f}ms p95={cuts[94]:.1f}ms p99={cuts[98]:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--todos", type=int, default=100)
+    parser.add_argument("--inline-hashing", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""Cost of loading a large todo page as entities vs. column rows.
+
+Runs the ``GET /todos/`` page query both ways against a throwaway SQLite
+database and validates the result into ``TodoList``, reporting CPU time
+and peak traced memory per page::
+
+    python -m benchmarks.projection --todos 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import process_time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks.harness import seed
+from fast_zero.models import Todo
+from fast_zero.routers.todos import PUBLIC_COLUMNS
+from fast_zero.schemas import TodoList
+
+
+async def load_entities(session: AsyncSession, user_id: int):
+    query = select(Todo).where(Todo.user_id == user_id).order_by(Todo.id)
+    return (await session.scalars(query)).all()
+
+
+async def load_columns(session: AsyncSession, user_id: int):
+    query = (
+        select(*PUBLIC_COLUMNS)
+        .where(Todo.user_id == user_id)
+        .order_by(Todo.id)
+    )
+    return (await session.execute(query)).all()
+
+
+async def sample(engine, load, user_id: int, trace: bool) -> float:
+    """CPU milliseconds per page, or peak traced MiB when ``trace``."""
+    # A fresh session per page, as each request gets one.
+    async with AsyncSession(engine) as session:
+        if trace:
+            tracemalloc.start()
+        start = process_time()
+        rows = await load(session, user_id)
+        TodoList.model_validate(
+            {"todos": rows}, from_attributes=True
+        ).model_dump_json()
+        elapsed = (process_time() - start) * 1000
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak / 2**20
+
+    return elapsed
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp)}/db")
+        (user,) = await seed(engine, users=1, todos=args.todos)
+
+        loaders = {"entities": load_entities, "columns": load_columns}
+        cpu = {name: [] for name in loaders}
+        peak = {name: [] for name in loaders}
+        for _ in range(args.repeat):
+            for name, load in loaders.items():
+                cpu[name].append(await sample(engine, load, user.id, False))
+                peak[name].append(await sample(engine, load, user.id, True))
+
+        await engine.dispose()
+
+    for name in loaders:
+        print(
+            f"{name:<9} rows={args.todos} "
+            f"cpu={statistics.median(cpu[name]):.1f}ms "
+            f"peak={statistics.median(peak[name]):.1f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--todos", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
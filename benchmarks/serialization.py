@@ -0,0 +1,65 @@
+"""CPU time of a 1000-row ``GET /users/`` with and without fast JSON.
+
+Serializes the same page with FastAPI's default response pipeline and with
+``FAST_JSON_RESPONSES`` enabled, reporting process CPU time per request so
+the database and event loop wait do not blur the comparison::
+
+    python -m benchmarks.serialization
+
+``GET /todos/`` always renders through the fast path now that its pages
+are cached as serialized JSON; see ``benchmarks.caching``.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+from pathlib import Path
+from time import process_time
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.harness import app_client, seed
+from fast_zero.routers import users
+
+
+async def cpu_time(client: AsyncClient, url, fast: bool) -> float:
+    users.settings.FAST_JSON_RESPONSES = fast
+    start = process_time()
+    response = await client.get(url)
+    elapsed = (process_time() - start) * 1000
+    response.raise_for_status()
+    return elapsed
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp)}/db")
+        await seed(engine, users=args.users, todos=0)
+
+        async with app_client(engine) as client:
+            url = f"/users/?limit={args.users}"
+
+            # Alternate the modes so warm-up and drift hit both equally.
+            samples = {False: [], True: []}
+            for i in range(args.requests * 2):
+                fast = bool(i % 2)
+                samples[fast].append(await cpu_time(client, url, fast))
+
+        await engine.dispose()
+
+    default = statistics.median(samples[False])
+    fast = statistics.median(samples[True])
+    print(f"rows={args.users} default={default:.2f}ms cpu/request")
+    print(
+        f"rows={args.users} fast_json={fast:.2f}ms cpu/request "
+        f"({(1 - fast / default) * 100:.0f}% saved)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
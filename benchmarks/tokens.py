@@ -0,0 +1,49 @@
+"""Access token throughput on one core: issue, decode, cached verify.
+
+Compares ``jwt.decode`` (what every request paid before) with the
+caching ``TokenVerifier`` once a token has been seen::
+
+    python -m benchmarks.tokens
+"""
+
+import argparse
+from time import process_time
+
+from jwt import decode
+
+from fast_zero.security import (
+    create_access_token,
+    settings,
+    token_verifier,
+)
+
+
+def throughput(func, iterations: int) -> float:
+    start = process_time()
+    for _ in range(iterations):
+        func()
+    return iterations / (process_time() - start)
+
+
+def main(args):
+    token = create_access_token({"sub": "bench", "uid": 1})
+    algorithms = (settings.ALGORITHM,)
+    token_verifier.verify(token)
+
+    scenarios = {
+        "create_access_token": lambda: create_access_token(
+            {"sub": "bench", "uid": 1}
+        ),
+        "jwt.decode": lambda: decode(
+            token, settings.SECRET_KEY, algorithms=algorithms
+        ),
+        "cached verify": lambda: token_verifier.verify(token),
+    }
+    for name, func in scenarios.items():
+        print(f"{name:<20}{throughput(func, args.iterations):>12,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    main(parser.parse_args())
@@ -4,4 +4,8 @@
 poetry run alembic upgrade head
 
 # Inicia a aplicação
-poetry run uvicorn --host 0.0.0.0 --port 8000 fast_zero.app:app
\ No newline at end of file
+# Confia no X-Forwarded-For apenas dos proxies em FORWARDED_ALLOW_IPS, para
+# que o limite de login por IP veja o endereço real do cliente
+poetry run uvicorn --host 0.0.0.0 --port 8000 \
+    --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}" \
+    fast_zero.app:app
\ No newline at end of file
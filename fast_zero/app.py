@@ -1,8 +1,62 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
 
-from fast_zero.routers import auth, todos, users
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-app = FastAPI()
+from fast_zero.database import engine, settings, warm_up_pool
+from fast_zero.events import broker
+from fast_zero.hashing import HashingBusy
+from fast_zero.instrumentation import QueryStatsMiddleware
+from fast_zero.metrics import MetricsMiddleware
+from fast_zero.routers import auth, metrics, todos, users
+from fast_zero.security import is_missing_user
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_POOL_WARMUP and engine.dialect.name == "postgresql":
+        try:
+            await warm_up_pool(engine, settings.DB_POOL_SIZE)
+        except (OSError, SQLAlchemyError):
+            logger.warning("Database pool warm-up failed", exc_info=True)
+
+    await broker.start()
+
+    yield
+
+    await broker.stop()
+    await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(todos.router)
 app.include_router(users.router)
 app.include_router(auth.router)
+app.include_router(metrics.router)
+
+
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(request: Request, exc: HashingBusy):
+    return JSONResponse(
+        {"detail": "Server busy, try again later"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    if not is_missing_user(exc):
+        raise exc
+
+    return JSONResponse(
+        {"detail": "Could not validate credentials"},
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from secrets import token_hex
+from time import monotonic
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after a TTL.
+
+    It is meant for small hot lookups shared by the requests of a single
+    worker, so it is not thread-safe and it is not shared across processes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            return default
+
+        if expires_at <= monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._data[key] = (monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExpiringDict:
+    """In-process mapping whose entries expire after a fixed TTL.
+
+    Unlike ``TTLCache`` it has no size limit, so an entry is never dropped
+    before it expires; use it for data that must not be forgotten early,
+    like revocations. Every entry lives for the same TTL, so insertion
+    order is expiry order and writes purge expired entries from the front.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= monotonic():
+            return default
+
+        return entry[1]
+
+    def set(self, key, value):
+        now = monotonic()
+        while self._data:
+            expires_at, _ = next(iter(self._data.values()))
+            if expires_at > now:
+                break
+            self._data.popitem(last=False)
+
+        self._data.pop(key, None)
+        self._data[key] = (now + self.ttl, value)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Versions:
+    """Per-key change counters used to validate cached representations.
+
+    Writers ``bump`` a key after committing; readers fold ``epoch`` and the
+    key's version into an ETag or a cache key. The epoch is random per
+    process, so validators handed out before a restart never match again.
+    Like ``TTLCache`` this lives in one worker's memory: writes handled by
+    another process are not seen.
+    """
+
+    def __init__(self):
+        self.epoch = token_hex(4)
+        self._versions: dict = {}
+
+    def get(self, key) -> int:
+        return self._versions.get(key, 0)
+
+    def bump(self, key):
+        self._versions[key] = self.get(key) + 1
+
+    def clear(self):
+        self.epoch = token_hex(4)
+        self._versions.clear()
@@ -0,0 +1,99 @@
+"""Maintenance commands, run against the configured database::
+
+python -m fast_zero.commands check-todo-counts
+python -m fast_zero.commands rebuild-todo-counts
+python -m fast_zero.commands calibrate-argon2 --target-ms 250
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.database import engine
+from fast_zero.hashing import calibrate_argon2
+from fast_zero.settings import Settings
+from fast_zero.stats import find_mismatches, rebuild_counts
+
+settings = Settings()
+
+
+async def check_todo_counts(args) -> int:
+    async with AsyncSession(engine) as session:
+        mismatches = await find_mismatches(session)
+
+    for user_id, state, stored, actual in mismatches:
+        print(
+            f"user={user_id} state={state.value} "
+            f"stored={stored} actual={actual}"
+        )
+    print(f"{len(mismatches)} mismatched todo counters")
+
+    return 1 if mismatches else 0
+
+
+async def rebuild_todo_counts(args) -> int:
+    async with AsyncSession(engine) as session, session.begin():
+        await rebuild_counts(session)
+
+    print("Todo counters rebuilt")
+    return 0
+
+
+async def calibrate_argon2_costs(args) -> int:
+    time_cost, memory_cost, elapsed = calibrate_argon2(
+        args.target_ms / 1000, args.memory_cost, args.parallelism
+    )
+
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+    print(f"# verify takes {elapsed * 1000:.0f}ms on this machine")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "check-todo-counts", help="report counters that disagree with todos"
+    ).set_defaults(handler=check_todo_counts)
+    commands.add_parser(
+        "rebuild-todo-counts", help="recompute every todo counter"
+    ).set_defaults(handler=rebuild_todo_counts)
+
+    calibrate = commands.add_parser(
+        "calibrate-argon2",
+        help="pick Argon2 costs for a target verify time on this machine",
+    )
+    calibrate.add_argument("--target-ms", type=float, default=250)
+    calibrate.add_argument(
+        "--memory-cost",
+        type=int,
+        default=settings.ARGON2_MEMORY_COST,
+        help="starting memory in KiB, halved if too slow",
+    )
+    calibrate.add_argument(
+        "--parallelism", type=int, default=settings.ARGON2_PARALLELISM
+    )
+    calibrate.set_defaults(handler=calibrate_argon2_costs)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    async def run():
+        try:
+            return await args.handler(args)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
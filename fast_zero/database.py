@@ -1,8 +1,120 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+from time import perf_counter
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from fast_zero.metrics import db_pool_checkout_wait
 from fast_zero.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long every checkout takes.
+
+    The pool's events fire once a connection is in hand, so the wait for a
+    free slot (or a new connection, or a pre-ping) is only visible around
+    ``connect``. A growing wait is the sign of a saturated pool.
+    """
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            db_pool_checkout_wait.observe(perf_counter() - started)
+
+
+def engine_options(settings: Settings) -> dict:
+    """Pool and driver options for ``create_async_engine``.
+
+    Only PostgreSQL gets a tuned pool; SQLite keeps SQLAlchemy's defaults,
+    which pick a pool class suited to file or in-memory databases.
+    """
+    if make_url(settings.DATABASE_URL).get_backend_name() != "postgresql":
+        return {}
+
+    statement_timeout = settings.DB_STATEMENT_TIMEOUT_MS
+
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "options": f"-c statement_timeout={statement_timeout}",
+            "prepare_threshold": settings.DB_PREPARE_THRESHOLD,
+        },
+    }
+
+
+class PoolMetrics:
+    """Counters fed by pool events of the engines it is attached to."""
+
+    def __init__(self):
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.checkouts = 0
+        self.checked_out = 0
+
+    def attach(self, engine: AsyncEngine):
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "do_connect", self._on_do_connect)
+        event.listen(sync_engine.pool, "connect", self._on_connect)
+        event.listen(sync_engine.pool, "checkout", self._on_checkout)
+        event.listen(sync_engine.pool, "checkin", self._on_checkin)
+
+    @staticmethod
+    def _on_do_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info["connect_started"] = perf_counter()
+
+    def _on_connect(self, dbapi_connection, conn_rec):
+        self.connects += 1
+        started = conn_rec.info.pop("connect_started", None)
+        if started is not None:
+            self.connect_seconds += perf_counter() - started
+
+    def _on_checkout(self, dbapi_connection, conn_rec, conn_proxy):
+        self.checkouts += 1
+        self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, conn_rec):
+        self.checked_out -= 1
+
+
+async def warm_up_pool(engine: AsyncEngine, size: int):
+    """Open ``size`` connections at once and return them to the pool.
+
+    If some fail, the ones that did open are still returned before the
+    first error is raised.
+    """
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(size)), return_exceptions=True
+    )
+    await asyncio.gather(
+        *(
+            result.close()
+            for result in results
+            if not isinstance(result, BaseException)
+        )
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+settings = Settings()
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings))
+pool_metrics = PoolMetrics()
+pool_metrics.attach(engine)
 
 
 async def get_session():  # pragma: no cover
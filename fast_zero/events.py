@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from secrets import token_hex
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from fast_zero.settings import Settings
+
+settings = Settings()
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "todo_events"
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_MAX_PAYLOAD = 7900
+
+
+@dataclass(frozen=True, slots=True)
+class TodoEvent:
+    """A committed change to some of a user's todos.
+
+    ``ids`` may be empty when the change is too large to list (imports,
+    oversized notifications); clients then catch up via the changes feed.
+    """
+
+    user_id: int
+    type: str
+    ids: list[int] = field(default_factory=list)
+
+
+class Subscription:
+    """One connection's bounded queue of events.
+
+    Publishing never waits on a slow consumer: when the queue is full the
+    pending events are dropped and ``lost`` is set, so the stream can tell
+    the client to resynchronize instead.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[TodoEvent] = asyncio.Queue(maxsize)
+        self.lost = False
+        self._wakeup = asyncio.Event()
+
+    def put(self, event: TodoEvent):
+        if self.lost:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.mark_lost()
+        self._wakeup.set()
+
+    def mark_lost(self):
+        self.lost = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self._wakeup.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until there is something to send; False on timeout."""
+        if self.lost or not self.queue.empty():
+            return True
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+
+class Hub:
+    """In-process fan-out of events to the subscriptions of each user."""
+
+    def __init__(self):
+        self.subscriptions: defaultdict[int, set[Subscription]] = defaultdict(
+            set
+        )
+        self.listeners: list = []
+        self.resync_listeners: list = []
+
+    @contextmanager
+    def subscribe(self, user_id: int, maxsize: int):
+        subscription = Subscription(maxsize)
+        self.subscriptions[user_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscriptions[user_id].discard(subscription)
+            if not self.subscriptions[user_id]:
+                del self.subscriptions[user_id]
+
+    def deliver(self, event: TodoEvent):
+        for listener in self.listeners:
+            listener(event)
+        for subscription in self.subscriptions.get(event.user_id, ()):
+            subscription.put(event)
+
+    def resync(self):
+        """Tell every subscriber that events may have been missed."""
+        for listener in self.resync_listeners:
+            listener()
+        for subscriptions in self.subscriptions.values():
+            for subscription in subscriptions:
+                subscription.mark_lost()
+
+    def __len__(self):
+        return sum(map(len, self.subscriptions.values()))
+
+
+class InMemoryBroker:
+    """Delivers events to this process only; enough for a single worker."""
+
+    # Whether every worker sees every event, so that state derived from
+    # them (cached pages, version tags) is valid across workers.
+    shared = False
+
+    def __init__(self, hub: Hub):
+        self.hub = hub
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, event: TodoEvent):
+        self.hub.deliver(event)
+
+
+class PostgresBroker:
+    """Fans events out to every worker through ``LISTEN``/``NOTIFY``.
+
+    Events are delivered locally right away and sent to the other workers
+    as notifications tagged with this broker's origin, which the listener
+    skips when they come back. A dedicated autocommit connection publishes
+    and another one listens, outside the SQLAlchemy pool.
+    """
+
+    shared = True
+
+    def __init__(self, hub: Hub, database_url: str):
+        self.hub = hub
+        self.conninfo = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self.origin = token_hex(8)
+        self._publisher: psycopg.AsyncConnection | None = None
+        self._listener: asyncio.Task | None = None
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        if self._publisher:
+            await self._publisher.close()
+
+    async def publish(self, event: TodoEvent):
+        self.hub.deliver(event)
+
+        payload = self._payload(event)
+        # A second try on a fresh connection covers a publisher connection
+        # that went stale while idle.
+        for attempt in range(2):
+            try:
+                if self._publisher is None or self._publisher.closed:
+                    self._publisher = await psycopg.AsyncConnection.connect(
+                        self.conninfo, autocommit=True
+                    )
+                await self._publisher.execute(
+                    "SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, payload)
+                )
+                return
+            except psycopg.Error:
+                if self._publisher is not None:
+                    await self._publisher.close()
+                if attempt:
+                    logger.warning(
+                        "Could not publish todo event", exc_info=True
+                    )
+
+    def _payload(self, event: TodoEvent) -> str:
+        payload = json.dumps({"origin": self.origin, **asdict(event)})
+        if len(payload.encode()) >= NOTIFY_MAX_PAYLOAD:
+            payload = json.dumps(
+                {
+                    "origin": self.origin,
+                    **asdict(event),
+                    "ids": [],
+                }
+            )
+        return payload
+
+    async def _listen(self):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self.conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    # Whatever was published before listening is unseen.
+                    self.hub.resync()
+                    async for notify in conn.notifies():
+                        self._receive(notify.payload)
+            except psycopg.Error:
+                logger.warning("Todo event listener lost", exc_info=True)
+            # Whatever was published while not listening is gone.
+            self.hub.resync()
+            await asyncio.sleep(1)
+
+    def _receive(self, payload: str):
+        data = json.loads(payload)
+        if data.pop("origin") != self.origin:
+            self.hub.deliver(TodoEvent(**data))
+
+
+def format_event(event: str, data) -> str:
+    """One server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def event_stream(subscription: Subscription, heartbeat: float):
+    """Server-sent events for ``subscription``, with keep-alive comments."""
+    yield ": connected\n\n"
+    while True:
+        if not await subscription.wait(heartbeat):
+            yield ": keep-alive\n\n"
+            continue
+
+        if subscription.lost:
+            subscription.lost = False
+            yield format_event("resync", {})
+            continue
+
+        event = subscription.queue.get_nowait()
+        yield format_event(event.type, {"ids": event.ids})
+
+
+def create_broker(hub: Hub):
+    if settings.EVENT_BROKER == "postgres":
+        return PostgresBroker(hub, settings.DATABASE_URL)
+    return InMemoryBroker(hub)
+
+
+hub = Hub()
+broker = create_broker(hub)
@@ -0,0 +1,138 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+# Argon2 requires at least 8 KiB of memory per lane.
+ARGON2_MIN_MEMORY_PER_LANE = 8
+
+
+class HashingBusy(Exception):
+    """The pool is too far behind to take on another hash."""
+
+
+class HashingPool:
+    """Bounded worker pool for CPU-heavy password hashing.
+
+    Argon2 releases the GIL while hashing, so a thread pool keeps the event
+    loop responsive and still uses several cores. At most ``max_workers``
+    hashes run at once; extra calls wait in the executor queue.
+
+    Admission control keeps a burst from piling up unbounded work: with
+    ``max_queue`` set, calls beyond that many waiting jobs are refused
+    outright, and with ``queue_timeout`` set, a job that waited longer than
+    that for a worker is dropped instead of hashed for a caller that has
+    likely given up. Both raise ``HashingBusy``.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        on_wait=None,
+        max_queue: int | None = None,
+        queue_timeout: float | None = None,
+    ):
+        self.max_workers = max_workers
+        self.on_wait = on_wait
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._lock = Lock()
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self.submitted - self.running - self.completed
+
+    async def run(self, func, /, *args):
+        with self._lock:
+            queued = self.submitted - self.running - self.completed
+            if self.max_queue is not None and queued >= self.max_queue:
+                self.rejected += 1
+                raise HashingBusy("Password hashing queue is full")
+            self.submitted += 1
+
+        submitted = perf_counter()
+        future = self._executor.submit(self._call, func, args, submitted)
+        future.add_done_callback(self._release_cancelled)
+        started, result = await asyncio.wrap_future(future)
+
+        if self.on_wait:
+            self.on_wait(started - submitted)
+        return result
+
+    def _release_cancelled(self, future):
+        # Cancelling the awaiting task cancels a job still in the queue, so
+        # _call never runs to count it; free its queue slot here instead.
+        if future.cancelled():
+            with self._lock:
+                self.completed += 1
+
+    def _call(self, func, args, submitted):
+        started = perf_counter()
+        if (
+            self.queue_timeout is not None
+            and started - submitted > self.queue_timeout
+        ):
+            with self._lock:
+                self.completed += 1
+                self.rejected += 1
+            raise HashingBusy(
+                "Timed out waiting for a password hashing worker"
+            )
+
+        with self._lock:
+            self.running += 1
+        try:
+            return started, func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def time_argon2(hasher: Argon2Hasher, rounds: int = 3) -> float:
+    """Best-of-``rounds`` seconds ``hasher`` takes to verify a password."""
+    hashed = hasher.hash("calibration")
+    timings = []
+    for _ in range(rounds):
+        start = perf_counter()
+        hasher.verify("calibration", hashed)
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def calibrate_argon2(
+    target: float, memory_cost: int, parallelism: int
+) -> tuple[int, int, float]:
+    """Argon2 costs whose verify takes about ``target`` seconds here.
+
+    Starts from ``memory_cost`` KiB with one pass, halving the memory while
+    that alone is over the target, then adds passes, whose cost is close to
+    linear, up to the target. Returns ``(time_cost, memory_cost,
+    seconds)`` with the measured verify time of the result.
+    """
+    min_memory = ARGON2_MIN_MEMORY_PER_LANE * parallelism
+    elapsed = time_argon2(Argon2Hasher(1, memory_cost, parallelism))
+    while elapsed > target and memory_cost // 2 >= min_memory:
+        memory_cost //= 2
+        elapsed = time_argon2(Argon2Hasher(1, memory_cost, parallelism))
+
+    time_cost = max(1, int(target / elapsed))
+    if time_cost > 1:
+        elapsed = time_argon2(
+            Argon2Hasher(time_cost, memory_cost, parallelism)
+        )
+
+    return time_cost, memory_cost, elapsed
@@ -0,0 +1,125 @@
+import json
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from fast_zero.settings import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def repeated_statements(self, threshold: int) -> dict[str, int]:
+        """Statements run at least ``threshold`` times: likely N+1 loops."""
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= threshold
+        }
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.2f}"
+        )
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, *args):
+    conn.info["query_started"] = perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, *args):
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, perf_counter() - conn.info["query_started"])
+
+
+class QueryStatsMiddleware:
+    """Attach per-request database statistics to responses and logs.
+
+    Every statement executed while serving a request is timed; the totals
+    go out as a ``Server-Timing`` header and one JSON log line per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            _log_request(scope, status_code, perf_counter() - started, stats)
+
+
+def _log_request(scope, status_code, seconds: float, stats: QueryStats):
+    logger.info(
+        json.dumps(
+            {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(seconds * 1000, 2),
+                "db_queries": stats.count,
+                "db_ms": round(stats.seconds * 1000, 2),
+                "db_slowest_ms": round(stats.slowest_seconds * 1000, 2),
+                "db_slowest_statement": stats.slowest_statement,
+            }
+        )
+    )
+
+    repeated = stats.repeated_statements(settings.N_PLUS_ONE_THRESHOLD)
+    for statement, count in repeated.items():
+        logger.warning(
+            "Possible N+1 on %s %s: statement ran %d times: %s",
+            scope["method"],
+            scope["path"],
+            count,
+            statement,
+        )
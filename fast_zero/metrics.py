@@ -0,0 +1,198 @@
+"""Minimal Prometheus metrics rendered in the text exposition format.
+
+Metrics are per process: with several uvicorn workers each one keeps and
+serves its own numbers. Updates only happen on the event loop thread, so
+they are plain integer and float increments without locks.
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _format_labels(names, values, extra="") -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labels=(), callback=None
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.callback = callback
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        if self.callback:
+            yield self.name, self.callback()
+        for label_values, value in self._values.items():
+            yield self.name + _format_labels(self.labels, label_values), value
+
+
+class Gauge:
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def samples(self):
+        yield self.name, self.callback() if self.callback else self.value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels=(),
+        buckets=DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [
+                [0] * (len(self.buckets) + 1),
+                0.0,
+            ]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self):
+        for label_values, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labels, label_values, f'le="{bound}"'
+                )
+                yield f"{self.name}_bucket{labels}", cumulative
+
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels}", total
+            yield f"{self.name}_count{labels}", cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{name} {value}" for name, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time spent serving HTTP requests.",
+        labels=("method", "route"),
+    )
+)
+http_requests = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests served.",
+        labels=("method", "route", "status"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests being served.")
+)
+db_pool_checkout_wait = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent getting a connection out of the pool.",
+    )
+)
+password_hash_wait = registry.register(
+    Histogram(
+        "password_hash_queue_seconds",
+        "Time password hashing jobs waited for a free worker.",
+    )
+)
+
+
+class MetricsMiddleware:
+    """Record latency and status of each request by route template.
+
+    Requests that match no route are grouped under ``unmatched`` so that
+    arbitrary paths cannot create unbounded label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            template = route.path if route else "unmatched"
+            http_request_duration.observe(
+                perf_counter() - started, scope["method"], template
+            )
+            http_requests.inc(scope["method"], template, status_code)
@@ -1,7 +1,15 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import (
+    DDL,
+    ForeignKey,
+    Index,
+    event,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 table_registry = registry()
@@ -15,9 +23,20 @@ class TodoState(str, Enum):
     trash = "trash"
 
 
+def pg_trgm_available(ddl, target, bind, **kw):
+    return bind is not None and bool(
+        bind.scalar(
+            text(
+                "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+            )
+        )
+    )
+
+
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -31,13 +50,31 @@ class User:
     )
 
     todos: Mapped[list["Todo"]] = relationship(
-        init=False, cascade="all, delete-orphan", lazy="selectin"
+        init=False, cascade="all, delete-orphan", lazy="raise_on_sql"
     )
 
 
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = "todos"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_todos_user_id_id", "user_id", "id"),
+        Index("ix_todos_user_id_state_id", "user_id", "state", "id"),
+        Index("ix_todos_user_id_updated_at", "user_id", "updated_at"),
+        Index(
+            "ix_todos_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql", callable_=pg_trgm_available),
+        Index(
+            "ix_todos_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql", callable_=pg_trgm_available),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
@@ -49,5 +86,99 @@ class Todo:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    # Bumped by every UPDATE; the entity tag for If-Match, which
+    # updated_at cannot be with SQLite's one-second resolution.
+    version: Mapped[int] = mapped_column(
+        init=False,
+        server_default=text("1"),
+        onupdate=literal_column("version") + 1,
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
+
+@table_registry.mapped_as_dataclass
+class TodoCount:
+    """How many of a user's todos are in a state, kept by the write paths."""
+
+    __tablename__ = "todo_counts"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    state: Mapped[TodoState] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TodoTombstone:
+    """A deleted todo, kept so delta sync can report the deletion."""
+
+    __tablename__ = "todo_tombstones"
+    __table_args__ = (
+        Index(
+            "ix_todo_tombstones_user_id_deleted_at", "user_id", "deleted_at"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    todo_id: Mapped[int]
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE")
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
+
+
+event.listen(
+    Todo.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql", callable_=pg_trgm_available
+    ),
+)
+
+# SQLite has no trigram index type, so substring search is served by an
+# external-content FTS5 table kept in sync with ``todos`` by triggers.
+TODOS_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description,
+        content='todos', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_au AFTER UPDATE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+)
+
+for statement in TODOS_FTS_DDL:
+    event.listen(
+        Todo.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+
+event.listen(
+    Todo.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS todos_fts").execute_if(dialect="sqlite"),
+)
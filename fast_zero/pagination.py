@@ -0,0 +1,47 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def encode_cursor(last_id: int) -> str:
+    return urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(urlsafe_b64decode(cursor.encode()))
+    except (BinasciiError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+async def fetch_page(
+    session: AsyncSession,
+    query: Select,
+    key: InstrumentedAttribute,
+    page,
+) -> tuple[list, str | None]:
+    """Run ``query`` for one page ordered by ``key``.
+
+    ``query`` is expected to select columns rather than entities; the page
+    comes back as result rows, which the response schemas read by attribute.
+
+    With ``page.cursor`` set it seeks past the last seen key (keyset mode),
+    otherwise it falls back to ``OFFSET``. One extra row is fetched to tell
+    whether a next page exists; if it does, its cursor is returned.
+    """
+    if page.cursor:
+        query = query.where(key > decode_cursor(page.cursor))
+    else:
+        query = query.offset(page.offset)
+
+    query = query.order_by(key).limit(page.limit + 1)
+    rows = (await session.execute(query)).all()
+
+    if len(rows) <= page.limit:
+        return rows, None
+
+    rows = rows[: page.limit]
+    return rows, encode_cursor(getattr(rows[-1], key.key))
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from time import monotonic
+
+from fast_zero.settings import Settings
+
+settings = Settings()
+
+
+class InMemoryRateLimitBackend:
+    """Token buckets kept in this worker's memory.
+
+    Each worker enforces its own limits, so with several workers a client
+    gets up to that many times the configured rate. Buckets are evicted in
+    least recently used order past ``maxsize``; an evicted bucket starts
+    full again, which only matters for keys idle long enough to be full
+    anyway unless the key space is flooded.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take a token from ``key``'s bucket.
+
+        Returns 0 when one was available, otherwise the seconds until the
+        bucket will hold one again.
+        """
+        now = monotonic()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+    def clear(self):
+        self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """Allows ``burst`` hits at once per key, refilled at ``per_minute``.
+
+    The buckets live in ``backend``, anything with an async ``take(key,
+    capacity, rate)`` like ``InMemoryRateLimitBackend``; a store shared
+    by all workers (Redis, the database) makes the limits global.
+    """
+
+    def __init__(self, backend, name: str, burst: int, per_minute: float):
+        self.backend = backend
+        self.name = name
+        self.burst = burst
+        self.per_minute = per_minute
+        self.rejected = 0
+
+    async def hit(self, key: str) -> float:
+        """Count a hit for ``key``; seconds to wait if it is over the limit."""
+        retry_after = await self.backend.take(
+            f"{self.name}:{key}", self.burst, self.per_minute / 60
+        )
+        if retry_after:
+            self.rejected += 1
+        return retry_after
+
+
+def create_backend():
+    # Only the in-memory backend ships for now; a shared one plugs in here.
+    return InMemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+backend = create_backend()
+
+login_username_limiter = RateLimiter(
+    backend,
+    "login:username",
+    settings.LOGIN_USERNAME_BURST,
+    settings.LOGIN_USERNAME_PER_MINUTE,
+)
+login_ip_limiter = RateLimiter(
+    backend,
+    "login:ip",
+    settings.LOGIN_IP_BURST,
+    settings.LOGIN_IP_PER_MINUTE,
+)
+signup_ip_limiter = RateLimiter(
+    backend,
+    "signup:ip",
+    settings.SIGNUP_IP_BURST,
+    settings.SIGNUP_IP_PER_MINUTE,
+)
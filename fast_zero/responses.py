@@ -0,0 +1,73 @@
+from hashlib import blake2b
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def dump_json(model: type[BaseModel], content) -> str:
+    """Serialize ``content`` as ``model`` straight to a JSON string.
+
+    FastAPI validates a returned value against ``response_model``, dumps it
+    to Python data, runs ``jsonable_encoder`` and then ``json.dumps``.
+    Validating here and using pydantic-core's ``model_dump_json`` skips the
+    intermediate objects. The output matches ``response_model_exclude_none``.
+    """
+    return model.model_validate(content, from_attributes=True).model_dump_json(
+        exclude_none=True
+    )
+
+
+def fast_json_response(model: type[BaseModel], content) -> Response:
+    """A ``Response`` FastAPI passes through untouched; see ``dump_json``."""
+    return Response(dump_json(model, content), media_type="application/json")
+
+
+def make_etag(*parts) -> str:
+    """A strong entity tag derived from ``parts``."""
+    digest = blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value matches ``etag``.
+
+    If-None-Match uses the weak comparison, so a ``W/`` prefix sent back by
+    an intermediary that weakened the tag still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+def version_etag(version: int) -> str:
+    """A strong entity tag carrying a row's ``version``."""
+    return f'"{version}"'
+
+
+def if_match_versions(if_match: str) -> list[int] | None:
+    """The row versions an ``If-Match`` header accepts.
+
+    ``None`` stands for ``*``, any current version. Tags may be quoted, as
+    ``version_etag`` makes them, or bare ``version`` values copied from a
+    response body; weak tags never match under If-Match's strong
+    comparison and, like anything unparsable, are left out.
+    """
+    if if_match.strip() == "*":
+        return None
+
+    versions = []
+    for raw_tag in if_match.split(","):
+        tag = raw_tag.strip()
+        if tag.startswith("W/"):
+            continue
+        try:
+            versions.append(int(tag.strip('"')))
+        except ValueError:
+            continue
+    return versions
@@ -1,6 +1,7 @@
+from math import ceil
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,24 +9,41 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fast_zero import schemas
 from fast_zero.database import get_session
 from fast_zero.models import User
+from fast_zero.ratelimit import login_ip_limiter, login_username_limiter
 from fast_zero.security import (
+    Principal,
     create_access_token,
     get_current_user,
-    verify_password,
+    verify_and_update_password,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 Session = Annotated[AsyncSession, Depends(get_session)]
 
 
 @router.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2Form,
     session: Session,
 ):
+    # Both buckets count every attempt, and run before the user lookup and
+    # the password check so rejected attempts cost no hashing.
+    client_ip = request.client.host if request.client else ""
+    retry_after = max(
+        await login_username_limiter.hit(form_data.username),
+        await login_ip_limiter.hit(client_ip),
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(ceil(retry_after))},
+        )
+
     user = await session.scalar(
         select(User).where(User.username == form_data.username)
     )
@@ -36,18 +54,32 @@ async def login_for_access_token(
             detail="Incorrect email or password",
         )
 
-    if not verify_password(form_data.password, user.password):
+    valid, updated_hash = await verify_and_update_password(
+        form_data.password, user.password
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
-    access_token = create_access_token(data={"sub": user.username})
+    if updated_hash:
+        user.password = updated_hash
+        await session.commit()
+
+    access_token = create_access_token(
+        data={"sub": user.username, "uid": user.id}
+    )
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/refresh", response_model=schemas.Token)
 async def refresh_access_token(user: CurrentUser):
-    new_access_token = create_access_token({"sub": user.username})
+    new_access_token = create_access_token(
+        {
+            "sub": user.username,
+            "uid": user.id,
+        }
+    )
     return {"access_token": new_access_token, "token_type": "bearer"}
@@ -0,0 +1,96 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from fast_zero.database import engine, pool_metrics
+from fast_zero.events import hub
+from fast_zero.metrics import Counter, Gauge, registry
+from fast_zero.ratelimit import (
+    login_ip_limiter,
+    login_username_limiter,
+    signup_ip_limiter,
+)
+from fast_zero.security import hashing_pool
+
+router = APIRouter(tags=["metrics"])
+
+pool = engine.sync_engine.pool
+
+
+def _pool_stat(name: str) -> int:
+    # Pools used for SQLite (StaticPool, NullPool) have no size/overflow.
+    stat = getattr(pool, name, None)
+    return max(stat(), 0) if stat else 0
+
+
+for metric in (
+    Gauge(
+        "db_pool_size",
+        "Connections the pool keeps open.",
+        callback=lambda: _pool_stat("size"),
+    ),
+    Gauge(
+        "db_pool_checked_out",
+        "Connections currently checked out of the pool.",
+        callback=lambda: pool_metrics.checked_out,
+    ),
+    Gauge(
+        "db_pool_overflow",
+        "Connections open beyond the pool size.",
+        callback=lambda: _pool_stat("overflow"),
+    ),
+    Counter(
+        "db_pool_checkouts_total",
+        "Connections checked out of the pool.",
+        callback=lambda: pool_metrics.checkouts,
+    ),
+    Counter(
+        "db_pool_connects_total",
+        "New database connections opened.",
+        callback=lambda: pool_metrics.connects,
+    ),
+    Counter(
+        "db_pool_connect_seconds_total",
+        "Time spent opening new database connections.",
+        callback=lambda: pool_metrics.connect_seconds,
+    ),
+    Gauge(
+        "password_hash_queue_depth",
+        "Password hashing jobs waiting for a worker.",
+        callback=lambda: hashing_pool.queue_depth,
+    ),
+    Gauge(
+        "password_hash_running",
+        "Password hashing jobs currently running.",
+        callback=lambda: hashing_pool.running,
+    ),
+    Counter(
+        "password_hash_rejected_total",
+        "Password hashing jobs refused because the pool was overloaded.",
+        callback=lambda: hashing_pool.rejected,
+    ),
+    Counter(
+        "login_rate_limited_total",
+        "Login attempts rejected by the rate limits.",
+        callback=lambda: (
+            login_username_limiter.rejected + login_ip_limiter.rejected
+        ),
+    ),
+    Counter(
+        "signup_rate_limited_total",
+        "Signups rejected by the rate limit.",
+        callback=lambda: signup_ip_limiter.rejected,
+    ),
+    Gauge(
+        "todo_event_streams",
+        "Open todo event streams.",
+        callback=lambda: len(hub),
+    ),
+):
+    registry.register(metric)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -1,18 +1,83 @@
-from typing import Annotated
+from collections import Counter
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero import schemas
+from fast_zero.cache import TTLCache, Versions
 from fast_zero.database import get_session
-from fast_zero.models import Todo, User
-from fast_zero.security import get_current_user
+from fast_zero.events import TodoEvent, broker, event_stream, hub
+from fast_zero.models import Todo, TodoState, TodoTombstone
+from fast_zero.pagination import fetch_page
+from fast_zero.responses import (
+    dump_json,
+    etag_matches,
+    if_match_versions,
+    make_etag,
+    version_etag,
+)
+from fast_zero.search import get_search_backend
+from fast_zero.security import Principal, get_token_user
+from fast_zero.settings import Settings
+from fast_zero.stats import adjust_counts, read_counts
+from fast_zero.sync import fetch_changes
+from fast_zero.transfer import (
+    MalformedRecord,
+    iter_csv,
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson,
+)
+
+settings = Settings()
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_token_user)]
 Session = Annotated[AsyncSession, Depends(get_session)]
+FileFormat = Annotated[Literal["ndjson", "csv"], Query(alias="format")]
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+IMPORT_MAX_REPORTED_ERRORS = 100
+PUBLIC_FIELDS = list(schemas.TodoPublic.model_fields)
+PUBLIC_COLUMNS = [getattr(Todo, field) for field in PUBLIC_FIELDS]
+
+# Bumped by every committed write to a user's todos, including writes
+# other workers announce through the broker; list pages are cached and
+# tagged per (user, filter, version). Only used with a shared broker.
+todo_versions = Versions()
+todo_pages = TTLCache(
+    maxsize=settings.TODO_PAGE_CACHE_MAX_SIZE,
+    ttl=settings.TODO_PAGE_CACHE_TTL_SECONDS,
+)
+hub.listeners.append(lambda event: todo_versions.bump(event.user_id))
+
+
+def forget_cached_pages():
+    """Drop every cached page and validator; some writes went unseen."""
+    todo_versions.clear()
+    todo_pages.clear()
+
+
+hub.resync_listeners.append(forget_cached_pages)
+
+
+async def publish(user_id: int, event_type: str, ids=()):
+    """Announce a committed change to the user's todos."""
+    await broker.publish(TodoEvent(user_id, event_type, list(ids)))
 
 
 @router.post(
@@ -23,68 +88,428 @@ async def create_todo(
 ):
     db_todo = Todo(**todo.model_dump(), user_id=user.id)
     session.add(db_todo)
+    await adjust_counts(session, user.id, Counter([todo.state]))
     await session.commit()
-    await session.refresh(db_todo)
+    await publish(user.id, "created", [db_todo.id])
 
     return db_todo
 
 
-@router.get("/", response_model=schemas.TodoList)
+@router.get(
+    "/",
+    response_model=schemas.TodoList,
+    response_model_exclude_none=True,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"}},
+)
 async def get_todos(
     session: Session,
     user: CurrentUser,
     todo_filter: Annotated[schemas.FilterTodo, Query()],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    query = select(Todo).where(Todo.user_id == user.id)
+    if not broker.shared:
+        # Writes handled by other workers never reach this one, so neither
+        # cached pages nor version tags can be trusted; tag the page by its
+        # content instead.
+        body = await _render_todo_page(session, user.id, todo_filter)
+        etag = make_etag(body)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+        return Response(
+            body, media_type="application/json", headers={"ETag": etag}
+        )
+
+    filter_key = todo_filter.model_dump_json()
+    version = todo_versions.get(user.id)
+    etag = make_etag(todo_versions.epoch, user.id, version, filter_key)
+
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    cache_key = (user.id, version, filter_key)
+    body = todo_pages.get(cache_key)
+
+    if body is None:
+        body = await _render_todo_page(session, user.id, todo_filter)
+        todo_pages.set(cache_key, body)
+
+    return Response(
+        body, media_type="application/json", headers={"ETag": etag}
+    )
+
+
+async def _render_todo_page(
+    session: AsyncSession, user_id: int, todo_filter: schemas.FilterTodo
+) -> str:
+    query = select(*PUBLIC_COLUMNS).where(Todo.user_id == user_id)
+    search = get_search_backend(session.bind.dialect.name)
 
     if todo_filter.title:
-        query = query.where(Todo.title.icontains(todo_filter.title))
+        query = search(query, Todo.title, todo_filter.title)
 
     if todo_filter.description:
-        query = query.where(
-            Todo.description.icontains(todo_filter.description)
-        )
+        query = search(query, Todo.description, todo_filter.description)
 
     if todo_filter.state:
         query = query.where(Todo.state == todo_filter.state)
 
-    query = query.offset(todo_filter.offset).limit(todo_filter.limit)
+    todos, next_cursor = await fetch_page(session, query, Todo.id, todo_filter)
+    return dump_json(
+        schemas.TodoList, {"todos": todos, "next_cursor": next_cursor}
+    )
 
-    todos = await session.scalars(query)
 
-    return {"todos": todos.all()}
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+    )
 
 
-@router.patch("/{todo_id}", response_model=schemas.TodoPublic)
-async def partial_update_todo(
-    todo_id: int, session: Session, user: CurrentUser, todo: schemas.TodoUpdate
+@router.get("/export", response_class=StreamingResponse)
+async def export_todos(
+    session: Session, user: CurrentUser, file_format: FileFormat = "ndjson"
 ):
-    db_todo = await session.scalar(
-        select(Todo).where(Todo.id == todo_id, Todo.user_id == user.id)
+    query = (
+        select(*PUBLIC_COLUMNS)
+        .where(Todo.user_id == user.id)
+        .order_by(Todo.id)
+        .execution_options(yield_per=settings.TODO_EXPORT_BATCH_SIZE)
     )
-    if not db_todo:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
-        )
 
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(db_todo, key, value)
+    async def todos():
+        # The session dependency has already been finalized once the body
+        # starts streaming, so the stream releases the connection itself.
+        try:
+            rows = await session.stream(query)
+            async for row in rows:
+                yield schemas.TodoPublic.model_validate(row._mapping)
+        finally:
+            await session.close()
 
-    session.add(db_todo)
+    if file_format == "csv":
+        body = iter_csv(todos(), PUBLIC_FIELDS)
+    else:
+        body = iter_ndjson(todos())
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=todos.{file_format}"
+        },
+    )
+
+
+@router.get("/changes", response_model=schemas.TodoChanges)
+async def get_todo_changes(
+    session: Session,
+    user: CurrentUser,
+    changes_filter: Annotated[schemas.FilterChanges, Query()],
+):
+    return await fetch_changes(
+        session,
+        user.id,
+        PUBLIC_COLUMNS,
+        changes_filter.since,
+        changes_filter.limit,
+    )
+
+
+@router.get("/stats", response_model=schemas.TodoStats)
+async def get_todo_stats(session: Session, user: CurrentUser):
+    counts = await read_counts(session, user.id)
+    return {"counts": counts, "total": sum(counts.values())}
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_todo_events(user: CurrentUser):
+    async def events():
+        with hub.subscribe(user.id, settings.EVENT_QUEUE_SIZE) as subscription:
+            async for frame in event_stream(
+                subscription, settings.EVENT_STREAM_HEARTBEAT_SECONDS
+            ):
+                yield frame
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/import", response_model=schemas.TodoImportSummary)
+async def import_todos(
+    request: Request,
+    session: Session,
+    user: CurrentUser,
+    file_format: FileFormat = "ndjson",
+):
+    if file_format == "csv":
+        records = iter_csv_records(request.stream())
+        validate = schemas.TodoSchema.model_validate
+    else:
+        records = iter_lines(request.stream())
+        validate = schemas.TodoSchema.model_validate_json
+
+    imported, failed, errors, batch = 0, 0, [], []
+
+    async for line, record in records:
+        try:
+            if isinstance(record, MalformedRecord):
+                raise record
+            todo = validate(record)
+        except (MalformedRecord, ValidationError) as exc:
+            failed += 1
+            if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({"line": line, "detail": _describe(exc)})
+            continue
+
+        batch.append(dict(todo.model_dump(), user_id=user.id))
+        if len(batch) >= settings.TODO_IMPORT_BATCH_SIZE:
+            await _insert_batch(session, user.id, batch)
+            imported += len(batch)
+            batch = []
+
+    if batch:
+        await _insert_batch(session, user.id, batch)
+        imported += len(batch)
     await session.commit()
-    await session.refresh(db_todo)
+    await publish(user.id, "imported")
 
-    return db_todo
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+
+async def _insert_batch(session: AsyncSession, user_id: int, batch: list):
+    await session.execute(insert(Todo), batch)
+    await adjust_counts(
+        session, user_id, Counter(todo["state"] for todo in batch)
+    )
 
 
-@router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_todo(todo_id: int, session: Session, user: CurrentUser):
-    db_todo = await session.scalar(
-        select(Todo).where(Todo.id == todo_id, Todo.user_id == user.id)
+def _describe(exc: MalformedRecord | ValidationError) -> str:
+    if isinstance(exc, MalformedRecord):
+        return str(exc)
+    return "; ".join(
+        ".".join(map(str, error["loc"])) + ": " + error["msg"]
+        if error["loc"]
+        else error["msg"]
+        for error in exc.errors()
     )
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.TodoList,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_create_todos(
+    session: Session, user: CurrentUser, bulk: schemas.TodoBulkCreate
+):
+    todos = await session.scalars(
+        insert(Todo).returning(Todo, sort_by_parameter_order=True),
+        [dict(todo.model_dump(), user_id=user.id) for todo in bulk.todos],
+    )
+    db_todos = todos.all()
+    await adjust_counts(
+        session, user.id, Counter(todo.state for todo in bulk.todos)
+    )
+    await session.commit()
+    await publish(user.id, "created", [todo.id for todo in db_todos])
+
+    return {"todos": db_todos}
+
+
+@router.patch("/bulk", response_model=schemas.TodoBulkResultList)
+async def bulk_update_todos(
+    session: Session, user: CurrentUser, bulk: schemas.TodoBulkUpdate
+):
+    # Locked, so concurrent state changes cannot skew the counters.
+    owned = await session.execute(
+        select(Todo.id, Todo.state)
+        .where(
+            Todo.id.in_({todo.id for todo in bulk.todos}),
+            Todo.user_id == user.id,
+        )
+        .with_for_update()
+    )
+    owned_states = dict(owned.tuples().all())
+    owned_ids = owned_states.keys()
+
+    changes = [
+        todo.model_dump(exclude_unset=True)
+        for todo in bulk.todos
+        if todo.id in owned_ids and todo.model_fields_set - {"id"}
+    ]
+    if changes:
+        await session.execute(update(Todo), changes)
+
+    deltas = Counter()
+    for change in changes:
+        if change.get("state") is not None:
+            deltas[owned_states[change["id"]]] -= 1
+            deltas[TodoState(change["state"])] += 1
+            owned_states[change["id"]] = TodoState(change["state"])
+    await adjust_counts(session, user.id, deltas)
+    await session.commit()
+    await publish(user.id, "updated", [todo["id"] for todo in changes])
+
+    return {
+        "results": [
+            {
+                "id": todo.id,
+                "status": "updated" if todo.id in owned_ids else "not_found",
+            }
+            for todo in bulk.todos
+        ]
+    }
+
+
+@router.delete("/bulk", response_model=schemas.TodoBulkResultList)
+async def bulk_delete_todos(
+    session: Session, user: CurrentUser, bulk: schemas.TodoBulkDelete
+):
+    deleted = (
+        await session.execute(
+            delete(Todo)
+            .where(Todo.id.in_(bulk.ids), Todo.user_id == user.id)
+            .returning(Todo.id, Todo.state)
+        )
+    ).all()
+    deleted_ids = {todo.id for todo in deleted}
+    if deleted_ids:
+        deltas = Counter()
+        deltas.subtract(todo.state for todo in deleted)
+        await adjust_counts(session, user.id, deltas)
+        await session.execute(
+            insert(TodoTombstone),
+            [
+                {"todo_id": todo_id, "user_id": user.id}
+                for todo_id in deleted_ids
+            ],
+        )
+    await session.commit()
+    await publish(user.id, "deleted", sorted(deleted_ids))
+
+    return {
+        "results": [
+            {
+                "id": todo_id,
+                "status": "deleted" if todo_id in deleted_ids else "not_found",
+            }
+            for todo_id in bulk.ids
+        ]
+    }
+
+
+@router.patch(
+    "/{todo_id}",
+    response_model=schemas.TodoPublic,
+    responses={
+        status.HTTP_412_PRECONDITION_FAILED: {
+            "description": "Precondition Failed"
+        }
+    },
+)
+async def partial_update_todo(
+    todo_id: int,
+    session: Session,
+    user: CurrentUser,
+    todo: schemas.TodoUpdate,
+    if_match: Annotated[str | None, Header()] = None,
+):
+    conditions = _todo_conditions(todo_id, user.id, if_match)
+    values = todo.model_dump(exclude_unset=True)
+    old_state = None
+
+    if todo.state is not None:
+        # The previous state feeds the counters; the row stays locked
+        # until commit, so a concurrent state change cannot skew them.
+        old_state = await session.scalar(
+            select(Todo.state).where(*conditions).with_for_update()
+        )
+
+    if values:
+        query = (
+            update(Todo)
+            .where(*conditions)
+            .values(values)
+            .returning(*PUBLIC_COLUMNS)
+        )
+    else:
+        query = select(*PUBLIC_COLUMNS).where(*conditions)
+
+    db_todo = (await session.execute(query)).first()
     if not db_todo:
+        await _raise_missing(session, todo_id, user.id, if_match)
+
+    if todo.state is not None:
+        deltas = Counter({db_todo.state: 1})
+        deltas[old_state] -= 1
+        await adjust_counts(session, user.id, deltas)
+
+    await session.commit()
+    if values:
+        await publish(user.id, "updated", [todo_id])
+
+    return Response(
+        dump_json(schemas.TodoPublic, db_todo),
+        media_type="application/json",
+        headers={"ETag": version_etag(db_todo.version)},
+    )
+
+
+@router.delete(
+    "/{todo_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        status.HTTP_412_PRECONDITION_FAILED: {
+            "description": "Precondition Failed"
+        }
+    },
+)
+async def delete_todo(
+    todo_id: int,
+    session: Session,
+    user: CurrentUser,
+    if_match: Annotated[str | None, Header()] = None,
+):
+    state = await session.scalar(
+        delete(Todo)
+        .where(*_todo_conditions(todo_id, user.id, if_match))
+        .returning(Todo.state)
+    )
+    if state is None:
+        await _raise_missing(session, todo_id, user.id, if_match)
+
+    session.add(TodoTombstone(todo_id=todo_id, user_id=user.id))
+    await adjust_counts(session, user.id, Counter({state: -1}))
+    await session.commit()
+    await publish(user.id, "deleted", [todo_id])
+
+
+def _todo_conditions(todo_id: int, user_id: int, if_match: str | None):
+    """Match one of the user's todos, at a version ``If-Match`` accepts."""
+    conditions = [Todo.id == todo_id, Todo.user_id == user_id]
+    versions = if_match_versions(if_match) if if_match else None
+    if versions is not None:
+        conditions.append(Todo.version.in_(versions))
+    return conditions
+
+
+async def _raise_missing(
+    session: AsyncSession, todo_id: int, user_id: int, if_match: str | None
+):
+    """Tell a missing todo from a stale ``If-Match`` after a miss."""
+    if if_match and await session.scalar(
+        select(Todo.id).where(*_todo_conditions(todo_id, user_id, None))
+    ):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task was modified",
         )
-    await session.delete(db_todo)
-    await session.commit()
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+    )
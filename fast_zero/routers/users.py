@@ -1,32 +1,65 @@
+from math import ceil
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import delete, insert, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero import schemas
 from fast_zero.database import get_session
-from fast_zero.models import User
+from fast_zero.models import TodoCount, TodoTombstone, User
+from fast_zero.pagination import fetch_page
+from fast_zero.ratelimit import signup_ip_limiter
+from fast_zero.responses import (
+    etag_matches,
+    fast_json_response,
+    make_etag,
+)
 from fast_zero.security import (
+    Principal,
     get_current_user,
     get_password_hash,
+    invalidate_principal,
+    revoke_tokens,
+    verify_and_update_password,
 )
+from fast_zero.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 Pagination = Annotated[schemas.FilterPage, Query()]
 
+PUBLIC_COLUMNS = [
+    getattr(User, field) for field in schemas.UserPublic.model_fields
+]
 
-@router.get("/", response_model=schemas.UserList)
+
+@router.get(
+    "/", response_model=schemas.UserList, response_model_exclude_none=True
+)
 async def read_users(session: Session, pagination: Pagination):
-    query = await session.scalars(
-        select(User).offset(pagination.offset).limit(pagination.limit)
+    users, next_cursor = await fetch_page(
+        session, select(*PUBLIC_COLUMNS), User.id, pagination
     )
-    users = query.all()
-    return {"users": users}
+    content = {"users": users, "next_cursor": next_cursor}
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(schemas.UserList, content)
+
+    return content
 
 
 @router.post(
@@ -34,46 +67,124 @@ async def read_users(session: Session, pagination: Pagination):
     status_code=status.HTTP_201_CREATED,
     response_model=schemas.UserPublic,
 )
-async def create_user(session: Session, user: schemas.UserSchema):
-    new_user = await session.scalar(
-        select(User).where(
-            (User.username == user.username) | (User.email == user.email)
+async def create_user(
+    request: Request, session: Session, user: schemas.UserSchema
+):
+    # Counted before hashing, so a burst of signups, duplicates included,
+    # cannot take over the hashing pool.
+    client_ip = request.client.host if request.client else ""
+    retry_after = await signup_ip_limiter.hit(client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many signups",
+            headers={"Retry-After": str(ceil(retry_after))},
         )
-    )
 
-    if new_user:
-        if new_user.username == user.username:
-            raise HTTPException(
-                status.HTTP_409_CONFLICT, detail="Username already exists"
-            )
-        elif new_user.email == user.email:
-            raise HTTPException(
-                status.HTTP_409_CONFLICT, detail="Email already exists"
-            )
+    # Hash first, so no transaction waits on it, then let the unique
+    # constraints catch duplicates in the same statement as the insert.
+    hashed_password = await get_password_hash(user.password)
 
-    hashed_password = get_password_hash(user.password)
+    try:
+        result = await session.execute(
+            insert(User)
+            .values(
+                username=user.username,
+                email=user.email,
+                password=hashed_password,
+            )
+            .returning(*PUBLIC_COLUMNS)
+        )
+        new_user = result.one()
+        await session.commit()
 
-    new_user = User(
-        username=user.username, email=user.email, password=hashed_password
-    )
-    session.add(new_user)
-    await session.commit()
-    await session.refresh(new_user)
+    except IntegrityError as exc:
+        await session.rollback()
+        raise HTTPException(
+            status.HTTP_409_CONFLICT, detail=_conflict_detail(session, exc)
+        )
 
     return new_user
 
 
-@router.get("/{user_id}", response_model=schemas.UserPublic)
-async def read_user(session: Session, user_id: int):
-    user = await session.scalar(select(User).where(User.id == user_id))
+# Unique constraints of users, by the name each dialect reports them with.
+USER_CONFLICTS = {
+    "postgresql": {
+        "users_username_key": "Username already exists",
+        "users_email_key": "Email already exists",
+    },
+    "sqlite": {
+        "users.username": "Username already exists",
+        "users.email": "Email already exists",
+    },
+}
+
+
+def _conflict_detail(session: AsyncSession, exc: IntegrityError) -> str:
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        constraint = exc.orig.diag.constraint_name
+    else:
+        # "UNIQUE constraint failed: users.username"
+        constraint = str(exc.orig).rpartition(": ")[2]
+
+    return USER_CONFLICTS.get(dialect, {}).get(
+        constraint, "Username or email already exists"
+    )
+
+
+@router.get(
+    "/{user_id}",
+    response_model=schemas.UserPublic,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"}},
+)
+async def read_user(
+    session: Session,
+    user_id: int,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    # Tagged by the row itself, so a write on any worker changes the tag;
+    # a 304 still saves serializing and sending the body.
+    user = (
+        await session.execute(
+            select(*PUBLIC_COLUMNS).where(User.id == user_id)
+        )
+    ).one_or_none()
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+
+    etag = make_etag(*user)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    response.headers["ETag"] = etag
     return user
 
 
+async def _get_own_user(session: AsyncSession, current_user: Principal):
+    """The authenticated user's row.
+
+    ``current_user`` may come from the principal cache after another worker
+    deleted the user; that is answered like any stale credential.
+    """
+    db_user = await session.get(User, current_user.id)
+    if not db_user:
+        invalidate_principal(current_user.username)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return db_user
+
+
 @router.put("/{user_id}", response_model=schemas.UserPublic)
 async def update_user(
     session: Session,
@@ -86,14 +197,22 @@ async def update_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to do this",
         )
+
+    db_user = await _get_own_user(session, current_user)
+
+    # Unchanged passwords keep their hash unless its costs are outdated.
+    valid, updated_hash = await verify_and_update_password(
+        user.password, db_user.password
+    )
+    if not valid:
+        updated_hash = await get_password_hash(user.password)
+
     try:
-        current_user.username = user.username
-        current_user.email = user.email
-        current_user.password = get_password_hash(user.password)
+        db_user.username = user.username
+        db_user.email = user.email
+        if updated_hash:
+            db_user.password = updated_hash
         await session.commit()
-        await session.refresh(current_user)
-
-        return current_user
 
     except IntegrityError:
         raise HTTPException(
@@ -101,6 +220,12 @@ async def update_user(
             detail="Username or email already exists",
         )
 
+    invalidate_principal(current_user.username)
+    if user.username != current_user.username:
+        revoke_tokens(user_id)
+
+    return db_user
+
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
@@ -114,5 +239,17 @@ async def delete_user(
             detail="You don't have permission to do this",
         )
 
-    await session.delete(current_user)
+    db_user = await _get_own_user(session, current_user)
+    # ON DELETE CASCADE covers these on PostgreSQL, not on SQLite, where a
+    # later user given the same id would otherwise inherit them.
+    await session.execute(
+        delete(TodoCount).where(TodoCount.user_id == user_id)
+    )
+    await session.execute(
+        delete(TodoTombstone).where(TodoTombstone.user_id == user_id)
+    )
+    await session.delete(db_user)
     await session.commit()
+
+    invalidate_principal(current_user.username)
+    revoke_tokens(user_id)
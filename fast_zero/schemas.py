@@ -1,8 +1,13 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 from fast_zero.models import TodoState
+from fast_zero.pagination import decode_cursor
+from fast_zero.sync import decode_change_cursor
+
+BULK_MAX_ITEMS = 1000
 
 
 class UserPublic(BaseModel):
@@ -21,6 +26,7 @@ class UserSchema(BaseModel):
 
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
 
 
 class Token(BaseModel):
@@ -30,7 +36,15 @@ class Token(BaseModel):
 
 class FilterPage(BaseModel):
     offset: int = 0
-    limit: int = 100
+    limit: int = Field(100, ge=1)
+    cursor: str | None = None
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, cursor: str | None):
+        if cursor is not None:
+            decode_cursor(cursor)
+        return cursor
 
 
 class TodoSchema(BaseModel):
@@ -43,10 +57,36 @@ class TodoPublic(TodoSchema):
     id: int
     created_at: datetime
     updated_at: datetime
+    version: int
 
 
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+
+
+class FilterChanges(BaseModel):
+    since: str | None = None
+    limit: int = Field(100, ge=1)
+
+    @field_validator("since")
+    @classmethod
+    def validate_since(cls, since: str | None):
+        if since is not None:
+            decode_change_cursor(since)
+        return since
+
+
+class TodoChanges(BaseModel):
+    todos: list[TodoPublic]
+    deleted: list[int]
+    next_cursor: str
+    has_more: bool
+
+
+class TodoStats(BaseModel):
+    counts: dict[TodoState, int]
+    total: int
 
 
 class TodoUpdate(BaseModel):
@@ -59,3 +99,41 @@ class FilterTodo(FilterPage):
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
+
+
+class TodoBulkCreate(BaseModel):
+    todos: list[TodoSchema] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TodoBulkUpdateItem(TodoUpdate):
+    id: int
+
+
+class TodoBulkUpdate(BaseModel):
+    todos: list[TodoBulkUpdateItem] = Field(
+        min_length=1, max_length=BULK_MAX_ITEMS
+    )
+
+
+class TodoBulkDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TodoBulkResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
+
+
+class TodoBulkResultList(BaseModel):
+    results: list[TodoBulkResult]
+
+
+class TodoImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TodoImportSummary(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TodoImportError]
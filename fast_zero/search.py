@@ -0,0 +1,41 @@
+from sqlalchemy import Select, column, select, table
+from sqlalchemy.orm import InstrumentedAttribute
+
+from fast_zero.models import Todo
+from fast_zero.settings import Settings
+
+settings = Settings()
+
+todos_fts = table(
+    "todos_fts", column("rowid"), column("title"), column("description")
+)
+
+
+def like_search(query: Select, field: InstrumentedAttribute, term: str):
+    """Portable case-insensitive substring search, without index support."""
+    return query.where(field.icontains(term))
+
+
+def pg_trgm_search(query: Select, field: InstrumentedAttribute, term: str):
+    """``ILIKE`` search, served by the ``pg_trgm`` GIN indexes on todos."""
+    return query.where(field.ilike(f"%{term}%"))
+
+
+def sqlite_fts_search(query: Select, field: InstrumentedAttribute, term: str):
+    """``LIKE`` search against the trigram-tokenized ``todos_fts`` table."""
+    matches = select(todos_fts.c.rowid).where(
+        todos_fts.c[field.key].like(f"%{term}%")
+    )
+    return query.where(Todo.id.in_(matches))
+
+
+SEARCH_BACKENDS = {
+    "postgresql": pg_trgm_search,
+    "sqlite": sqlite_fts_search,
+}
+
+
+def get_search_backend(dialect_name: str):
+    if settings.TODO_SEARCH_BACKEND == "like":
+        return like_search
+    return SEARCH_BACKENDS.get(dialect_name, like_search)
@@ -1,38 +1,159 @@
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from dataclasses import dataclass
+from hashlib import sha256
+from time import time
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jwt import DecodeError, ExpiredSignatureError, decode, encode
+from jwt import InvalidTokenError, decode, encode
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.cache import ExpiringDict, TTLCache
 from fast_zero.database import get_session
+from fast_zero.hashing import HashingPool
+from fast_zero.metrics import password_hash_wait
 from fast_zero.models import User
 from fast_zero.settings import Settings
 
 settings = Settings()
 
-pwd_ctx = PasswordHash.recommended()
+pwd_ctx = PasswordHash(
+    (
+        Argon2Hasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
+    )
+)
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    on_wait=password_hash_wait.observe,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    username: str
+
+
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# User ids whose tokens issued up to the stored time are no longer valid;
+# only consulted when tokens are trusted without a database lookup. Kept
+# until every token it covers has expired, however many there are.
+revoked_tokens = ExpiringDict(ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def invalidate_principal(username: str):
+    principal_cache.pop(username)
+
+
+def revoke_tokens(user_id: int):
+    revoked_tokens.set(user_id, int(time()))
+
+
+# PostgreSQL's foreign_key_violation; SQLite only reports it by message.
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def is_missing_user(exc: IntegrityError) -> bool:
+    """Whether ``exc`` is a write that referenced a user that is gone.
+
+    Every foreign key in the schema points at ``users``, so a violation
+    means a trusted token outlived its user.
+    """
+    sqlstate = getattr(exc.orig, "sqlstate", None)
+    return (
+        sqlstate == FOREIGN_KEY_VIOLATION
+        or "FOREIGN KEY constraint failed" in str(exc.orig)
+    )
+
+
+class TokenVerifier:
+    """Verifies access tokens, remembering the ones that passed.
+
+    Repeated requests with the same token skip the signature check and
+    JSON decoding. Entries are keyed by a SHA-256 digest of the token, so
+    the cache holds no usable credentials, and they expire no later than
+    the token's ``exp``.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str, cache: TTLCache):
+        self.secret_key = secret_key
+        self.algorithms = (algorithm,)
+        self.cache = cache
+
+    def verify(self, token: str) -> dict:
+        key = sha256(token.encode()).digest()
+        payload = self.cache.get(key)
+
+        if payload is None:
+            payload = decode(
+                token, self.secret_key, algorithms=self.algorithms
+            )
+            self.cache.set(key, payload, ttl=payload.get("exp", 0) - time())
+
+        return payload
+
+
+token_verifier = TokenVerifier(
+    settings.SECRET_KEY,
+    settings.ALGORITHM,
+    TTLCache(
+        maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+        ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+    ),
+)
+
+ACCESS_TOKEN_EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
 def create_access_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.now(tz=ZoneInfo("UTC")) + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    issued_at = int(time())
+    return encode(
+        {
+            **data,
+            "iat": issued_at,
+            "exp": issued_at + ACCESS_TOKEN_EXPIRE_SECONDS,
+        },
+        settings.SECRET_KEY,
+        settings.ALGORITHM,
     )
-    to_encode.update({"exp": expire})
-    return encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
 
 
-def get_password_hash(password: str):
-    return pwd_ctx.hash(password)
+async def get_password_hash(password: str):
+    return await hashing_pool.run(pwd_ctx.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str):
+    return await hashing_pool.run(
+        pwd_ctx.verify, plain_password, hashed_password
+    )
+
 
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password, with a new hash if the stored one is outdated.
 
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_ctx.verify(plain_password, hashed_password)
+    The new hash is only returned when the password matches and the stored
+    hash was made with other Argon2 costs than the configured ones.
+    """
+    return await hashing_pool.run(
+        pwd_ctx.verify_and_update, plain_password, hashed_password
+    )
 
 
 async def get_current_user(
@@ -46,25 +167,61 @@ async def get_current_user(
     )
 
     try:
-        payload = decode(
-            token, settings.SECRET_KEY, algorithms=(settings.ALGORITHM,)
-        )
+        payload = token_verifier.verify(token)
         subject_username = payload.get("sub")
 
         if not subject_username:
             raise credentials_exc
 
-    except DecodeError:
+    except InvalidTokenError:
         raise credentials_exc
 
-    except ExpiredSignatureError:
-        raise credentials_exc
+    principal = principal_cache.get(subject_username)
+    if principal:
+        return principal
 
-    user = await session.scalar(
-        select(User).where(User.username == subject_username)
+    user = await session.execute(
+        select(User.id, User.username).where(User.username == subject_username)
     )
+    row = user.first()
 
-    if not user:
+    if not row:
         raise credentials_exc
 
-    return user
+    principal = Principal(id=row.id, username=row.username)
+    principal_cache.set(
+        subject_username, principal, ttl=payload.get("exp", 0) - time()
+    )
+
+    return principal
+
+
+async def get_token_user(
+    session: AsyncSession = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+):
+    """``get_current_user`` that can trust the user id in the token.
+
+    With ``AUTH_TRUST_TOKEN_CLAIMS`` on, a valid token carrying ``uid`` is
+    accepted as is, without a database or principal cache lookup; only
+    tokens revoked on this worker are turned away. Renames and deletions
+    handled by other workers take effect when tokens expire, except that
+    writes referencing a deleted user fail on the foreign key and are
+    answered with 401 (see ``is_missing_user``).
+    """
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        try:
+            payload = token_verifier.verify(token)
+        except InvalidTokenError:
+            payload = {}
+
+        user_id, username = payload.get("uid"), payload.get("sub")
+        revoked_at = revoked_tokens.get(user_id)
+        if (
+            user_id is not None
+            and username
+            and (revoked_at is None or payload.get("iat", 0) > revoked_at)
+        ):
+            return Principal(id=user_id, username=username)
+
+    return await get_current_user(session, token)
@@ -10,3 +10,54 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5
+
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    LOGIN_USERNAME_BURST: int = 10
+    LOGIN_USERNAME_PER_MINUTE: float = 10
+    # Keyed on the client address uvicorn reports. Behind a proxy or load
+    # balancer that is the proxy's own address unless uvicorn runs with
+    # --proxy-headers and the proxy listed in --forwarded-allow-ips
+    # (FORWARDED_ALLOW_IPS in entrypoint.sh); otherwise every client
+    # shares one bucket.
+    LOGIN_IP_BURST: int = 30
+    LOGIN_IP_PER_MINUTE: float = 60
+    # Keyed on the client address like LOGIN_IP_*.
+    SIGNUP_IP_BURST: int = 10
+    SIGNUP_IP_PER_MINUTE: float = 10
+
+    TODO_SEARCH_BACKEND: str = "auto"
+    TODO_EXPORT_BATCH_SIZE: int = 1000
+    TODO_IMPORT_BATCH_SIZE: int = 1000
+
+    N_PLUS_ONE_THRESHOLD: int = 5
+    FAST_JSON_RESPONSES: bool = False
+    TODO_PAGE_CACHE_MAX_SIZE: int = 1024
+    TODO_PAGE_CACHE_TTL_SECONDS: int = 300
+    TODO_SYNC_SAFETY_WINDOW_SECONDS: int = 5
+
+    EVENT_BROKER: str = "memory"
+    EVENT_QUEUE_SIZE: int = 100
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+    DB_PREPARE_THRESHOLD: int | None = 5
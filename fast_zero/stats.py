@@ -0,0 +1,88 @@
+from collections import Counter
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import Todo, TodoCount, TodoState
+
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+async def adjust_counts(session: AsyncSession, user_id: int, deltas: Counter):
+    """Add ``deltas`` (state -> change) to the user's todo counters.
+
+    Runs inside the caller's transaction, so the counters commit or roll
+    back together with the todos they describe. Rows are written in state
+    order, so concurrent writers lock them in the same order.
+    """
+    rows = [
+        {"user_id": user_id, "state": state, "count": delta}
+        for state, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    upsert = UPSERTS[session.bind.dialect.name](TodoCount)
+    await session.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[TodoCount.user_id, TodoCount.state],
+            set_={"count": TodoCount.count + upsert.excluded.count},
+        ),
+        rows,
+    )
+
+
+async def read_counts(session: AsyncSession, user_id: int) -> dict:
+    counts = dict.fromkeys(TodoState, 0)
+    rows = await session.execute(
+        select(TodoCount.state, TodoCount.count).where(
+            TodoCount.user_id == user_id
+        )
+    )
+    counts.update(rows.tuples().all())
+    return counts
+
+
+def _actual_counts():
+    return select(Todo.user_id, Todo.state, func.count()).group_by(
+        Todo.user_id, Todo.state
+    )
+
+
+async def find_mismatches(session: AsyncSession) -> list[tuple]:
+    """``(user_id, state, stored, actual)`` for every wrong counter."""
+    actual = {
+        (user_id, state): count
+        for user_id, state, count in await session.execute(_actual_counts())
+    }
+    stored = {
+        (user_id, state): count
+        for user_id, state, count in await session.execute(
+            select(TodoCount.user_id, TodoCount.state, TodoCount.count)
+        )
+    }
+
+    return sorted(
+        (*key, stored.get(key, 0), actual.get(key, 0))
+        for key in actual.keys() | stored.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    )
+
+
+async def rebuild_counts(session: AsyncSession):
+    """Recompute every counter from the todos table.
+
+    On PostgreSQL the counters are locked first, so writers wait for the
+    rebuild instead of racing it; SQLite serializes writers anyway.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text("LOCK TABLE todo_counts IN EXCLUSIVE MODE"))
+
+    await session.execute(delete(TodoCount))
+    await session.execute(
+        TodoCount.__table__.insert().from_select(
+            ["user_id", "state", "count"], _actual_counts()
+        )
+    )
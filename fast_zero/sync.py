@@ -0,0 +1,108 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, func, literal, select, tuple_
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import Todo, TodoTombstone
+from fast_zero.settings import Settings
+
+settings = Settings()
+
+# SQLite fills timestamps from CURRENT_TIMESTAMP, which has no fractional
+# part, and compares them as text; cursor timestamps must be bound in the
+# same form or ties at a page boundary would not compare equal.
+SyncTimestamp = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format=(
+            "%(year)04d-%(month)02d-%(day)02d "
+            "%(hour)02d:%(minute)02d:%(second)02d"
+        )
+    ),
+    "sqlite",
+)
+
+
+def encode_change_cursor(changed_at: datetime, last_id: int) -> str:
+    value = f"{changed_at.isoformat()}|{last_id}"
+    return urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_change_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        changed_at, last_id = urlsafe_b64decode(cursor.encode()).split(b"|")
+        return datetime.fromisoformat(changed_at.decode()), int(last_id)
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+async def fetch_changes(
+    session: AsyncSession, user_id: int, columns, since: str | None, limit
+) -> dict:
+    """Todos changed and deleted after the ``since`` cursor, oldest first.
+
+    Changes are walked in ``(updated_at, id)`` order, one page of ``limit``
+    todos at a time, together with the tombstones that fall in the same
+    time span. Without a cursor every todo is returned and no tombstones.
+
+    Timestamps come from the start of each writing transaction, so a write
+    can commit with a timestamp slightly in the past. The final cursor is
+    therefore never later than ``TODO_SYNC_SAFETY_WINDOW_SECONDS`` before
+    the database clock: the next sync sees the recent window again, and
+    clients must apply changes idempotently (deletions first).
+    """
+    # Stored timestamps are naive wall-clock values from the same clock.
+    now = await session.scalar(select(func.now()))
+    horizon = now.replace(tzinfo=None) - timedelta(
+        seconds=settings.TODO_SYNC_SAFETY_WINDOW_SECONDS
+    )
+
+    query = select(*columns).where(Todo.user_id == user_id)
+    if since:
+        since_at, since_id = decode_change_cursor(since)
+        query = query.where(
+            tuple_(Todo.updated_at, Todo.id)
+            > tuple_(literal(since_at, SyncTimestamp), literal(since_id))
+        )
+        position = (since_at, since_id)
+    else:
+        position = None
+
+    query = query.order_by(Todo.updated_at, Todo.id).limit(limit + 1)
+    todos = (await session.execute(query)).all()
+    has_more = len(todos) > limit
+    todos = todos[:limit]
+    if todos:
+        position = (todos[-1].updated_at, todos[-1].id)
+
+    deleted = []
+    if since:
+        tombstones = (
+            select(TodoTombstone.todo_id, TodoTombstone.deleted_at)
+            .where(
+                TodoTombstone.user_id == user_id,
+                TodoTombstone.deleted_at > literal(since_at, SyncTimestamp),
+            )
+            .order_by(TodoTombstone.deleted_at, TodoTombstone.id)
+        )
+        if has_more:
+            tombstones = tombstones.where(
+                TodoTombstone.deleted_at <= literal(position[0], SyncTimestamp)
+            )
+
+        rows = (await session.execute(tombstones)).all()
+        deleted = [row.todo_id for row in rows]
+        if rows and rows[-1].deleted_at > position[0]:
+            position = (rows[-1].deleted_at, 0)
+
+    if not has_more and (position is None or position[0] > horizon):
+        position = (horizon, 0)
+
+    return {
+        "todos": todos,
+        "deleted": deleted,
+        "next_cursor": encode_change_cursor(*position),
+        "has_more": has_more,
+    }
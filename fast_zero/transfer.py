@@ -0,0 +1,98 @@
+import csv
+from codecs import getincrementaldecoder
+from collections.abc import AsyncIterable, AsyncIterator
+from io import StringIO
+
+from pydantic import BaseModel
+
+
+async def iter_ndjson(items: AsyncIterable[BaseModel]) -> AsyncIterator[str]:
+    async for item in items:
+        yield item.model_dump_json() + "\n"
+
+
+async def iter_csv(
+    items: AsyncIterable[BaseModel], fields: list[str]
+) -> AsyncIterator[str]:
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for item in items:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(item.model_dump(mode="json"))
+        yield buffer.getvalue()
+
+
+class MalformedRecord(ValueError):
+    """A record that could not be parsed at all."""
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], skip_blank: bool = True
+) -> AsyncIterator[tuple[int, str]]:
+    """Split a UTF-8 byte stream into ``(line_number, line)`` pairs.
+
+    Only the current partial line is buffered, so arbitrarily large bodies
+    can be consumed. Blank lines are skipped but still counted, unless
+    ``skip_blank`` is false.
+    """
+    decoder = getincrementaldecoder("utf-8")()
+    pending = ""
+    line_number = 0
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            if not skip_blank or line.strip():
+                yield line_number, line
+
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield line_number + 1, pending
+
+
+async def iter_csv_records(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, dict | MalformedRecord]]:
+    """Parse a CSV byte stream with a header row into dict records.
+
+    A quoted field may span several lines, blank ones included, so lines
+    are joined until ``csv`` can parse them as a whole record; each record
+    carries the line number it starts on. Records ``csv`` rejects, and a
+    quoted field still open at the end of the stream, come out as
+    ``MalformedRecord`` instead of a dict.
+    """
+    header = None
+    record, start = None, 0
+
+    async for line_number, line in iter_lines(chunks, skip_blank=False):
+        if record is None:
+            if not line.strip():
+                continue
+            record, start = line, line_number
+        else:
+            record = f"{record}\n{line}"
+
+        try:
+            values = next(csv.reader([record], strict=True))
+        except csv.Error as exc:
+            if str(exc) == "unexpected end of data":
+                continue
+            values = MalformedRecord(f"Malformed CSV record: {exc}")
+
+        if isinstance(values, MalformedRecord):
+            yield start, values
+        elif header is None:
+            header = values
+        else:
+            yield start, dict(zip(header, values))
+        record = None
+
+    if record is not None:
+        yield start, MalformedRecord("Unterminated quoted field")
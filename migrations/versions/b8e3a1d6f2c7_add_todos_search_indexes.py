@@ -0,0 +1,89 @@
+"""add todos search indexes
+
+Revision ID: b8e3a1d6f2c7
+Revises: 7d1f0c5a9e42
+Create Date: 2025-04-04 16:41:09.552310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e3a1d6f2c7'
+down_revision: Union[str, None] = '7d1f0c5a9e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_FTS_UPGRADE = (
+    """
+    CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description,
+        content='todos', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_fts_au AFTER UPDATE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')",
+)
+
+SQLITE_FTS_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS todos_fts_au",
+    "DROP TRIGGER IF EXISTS todos_fts_ad",
+    "DROP TRIGGER IF EXISTS todos_fts_ai",
+    "DROP TABLE IF EXISTS todos_fts",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        available = bind.scalar(sa.text(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        ))
+        if not available:
+            return
+
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_todos_title_trgm', 'todos', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+        op.create_index('ix_todos_description_trgm', 'todos', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+    elif bind.dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_todos_description_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_todos_title_trgm')
+
+    elif bind.dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_DOWNGRADE:
+            op.execute(statement)
@@ -1,7 +1,7 @@
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 
-import factory
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
@@ -11,17 +11,34 @@ from testcontainers.postgres import PostgresContainer
 
 from fast_zero.app import app
 from fast_zero.database import get_session
-from fast_zero.models import User, table_registry
-from fast_zero.security import get_password_hash
+from fast_zero.events import broker
+from fast_zero.models import table_registry
+from fast_zero.ratelimit import backend as rate_limit_backend
+from fast_zero.routers.todos import todo_pages, todo_versions
+from fast_zero.security import (
+    get_password_hash,
+    principal_cache,
+    revoked_tokens,
+    token_verifier,
+)
+from tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    principal_cache.clear()
+    revoked_tokens.clear()
+    token_verifier.cache.clear()
+    todo_pages.clear()
+    todo_versions.clear()
+    rate_limit_backend.clear()
 
 
-class UserFactory(factory.Factory):
-    class Meta:
-        model = User
-
-    username = factory.Sequence(lambda x: f"test_{x}")
-    email = factory.LazyAttribute(lambda obj: f"{obj.username}@test.com")
-    password = factory.LazyAttribute(lambda obj: f"{obj.username}-secret")
+@pytest.fixture
+def shared_broker(monkeypatch):
+    """Trust this process to see every write, as a shared broker does."""
+    monkeypatch.setattr(broker, "shared", True)
 
 
 @pytest.fixture
@@ -35,11 +52,22 @@ def client(session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def sqlite_client(sqlite_session):
+    def get_session_override():
+        return sqlite_session
+
+    with TestClient(app) as client:
+        app.dependency_overrides[get_session] = get_session_override
+        yield client
+    app.dependency_overrides.clear()
+
+
 @pytest_asyncio.fixture
 async def user(session):
     pwd = "test123"
 
-    user = UserFactory(password=get_password_hash(pwd))
+    user = UserFactory(password=await get_password_hash(pwd))
 
     session.add(user)
     await session.commit()
@@ -54,7 +82,7 @@ async def user(session):
 async def other_user(session):
     pwd = "test123"
 
-    user = UserFactory(password=get_password_hash(pwd))
+    user = UserFactory(password=await get_password_hash(pwd))
 
     session.add(user)
     await session.commit()
@@ -113,6 +141,19 @@ async def session(engine):
         await conn.run_sync(table_registry.metadata.drop_all)
 
 
+@pytest_asyncio.fixture
+async def sqlite_session():
+    sqlite_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+    async with sqlite_engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as session:
+        yield session
+
+    await sqlite_engine.dispose()
+
+
 @pytest.fixture(scope="session")
 def engine():
     with PostgresContainer("postgres:16", driver="psycopg") as postgres:
@@ -138,3 +179,50 @@ def _mock_db_time(*, model, time=datetime(2025, 1, 1)):
     yield time
 
     event.remove(model, "before_insert", fake_time_hook)
+
+
+@dataclass
+class QueryCounter:
+    statements: list[str] = field(default_factory=list)
+    rows: int = 0
+
+
+@pytest.fixture
+def query_counter(engine):
+    return lambda: _query_counter(engine=engine)
+
+
+@pytest.fixture
+def query_budget(query_counter):
+    return lambda max_queries: _query_budget(query_counter, max_queries)
+
+
+@contextmanager
+def _query_budget(query_counter, max_queries):
+    with query_counter() as counter:
+        yield counter
+
+    if len(counter.statements) > max_queries:
+        pytest.fail(
+            f"{len(counter.statements)} queries executed, "
+            f"budget was {max_queries}:\n" + "\n".join(counter.statements)
+        )
+
+
+@contextmanager
+def _query_counter(*, engine):
+    counter = QueryCounter()
+
+    def after_cursor_execute(conn, cursor, statement, *args):
+        counter.statements.append(statement)
+        counter.rows += max(cursor.rowcount, 0)
+
+    event.listen(
+        engine.sync_engine, "after_cursor_execute", after_cursor_execute
+    )
+
+    yield counter
+
+    event.remove(
+        engine.sync_engine, "after_cursor_execute", after_cursor_execute
+    )
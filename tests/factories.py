@@ -0,0 +1,23 @@
+import factory
+import factory.fuzzy
+
+from fast_zero.models import Todo, TodoState, User
+
+
+class UserFactory(factory.Factory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda x: f"test_{x}")
+    email = factory.LazyAttribute(lambda obj: f"{obj.username}@test.com")
+    password = factory.LazyAttribute(lambda obj: f"{obj.username}-secret")
+
+
+class TodoFactory(factory.Factory):
+    class Meta:
+        model = Todo
+
+    title = factory.Faker("text")
+    description = factory.Faker("text")
+    state = factory.fuzzy.FuzzyChoice(TodoState)
+    user_id = 1
@@ -1,5 +1,12 @@
+import pytest
 from fastapi import status
 from freezegun import freeze_time
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from fast_zero.hashing import HashingBusy
+from fast_zero.ratelimit import login_ip_limiter, login_username_limiter
+from fast_zero.routers import auth
+from fast_zero.security import pwd_ctx, verify_password
 
 
 def test_get_token(client, user):
@@ -60,3 +67,70 @@ def test_refresh_token(client, token):
     assert "access_token" in data
     assert "token_type" in data
     assert data["token_type"] == "bearer"
+
+
+def test_login_rate_limited_per_username(client, user, monkeypatch):
+    monkeypatch.setattr(login_username_limiter, "burst", 2)
+    data = {"username": user.username, "password": "wrong-password"}
+
+    client.post("/auth/token", data=data)
+    client.post("/auth/token", data=data)
+
+    async def fail(*args):
+        raise AssertionError("hashed a rate limited attempt")
+
+    monkeypatch.setattr(auth, "verify_and_update_password", fail)
+    response = client.post("/auth/token", data=data)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {"detail": "Too many login attempts"}
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_login_rate_limited_per_ip(client, user, monkeypatch):
+    monkeypatch.setattr(login_ip_limiter, "burst", 2)
+
+    statuses = [
+        client.post(
+            "/auth/token",
+            data={"username": f"user{i}", "password": "secret"},
+        ).status_code
+        for i in range(3)
+    ]
+
+    assert statuses == [
+        status.HTTP_401_UNAUTHORIZED,
+        status.HTTP_401_UNAUTHORIZED,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+
+
+def test_login_when_hashing_overloaded(client, user, monkeypatch):
+    async def busy(*args):
+        raise HashingBusy
+
+    monkeypatch.setattr(auth, "verify_and_update_password", busy)
+    response = client.post(
+        "/auth/token",
+        data={"username": user.username, "password": user.clean_password},
+    )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password(client, session, user):
+    weak = Argon2Hasher(time_cost=1, memory_cost=8192, parallelism=1)
+    user.password = weak.hash(user.clean_password)
+    await session.commit()
+
+    response = client.post(
+        "/auth/token",
+        data={"username": user.username, "password": user.clean_password},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    await session.refresh(user)
+    assert not pwd_ctx.current_hasher.check_needs_rehash(user.password)
+    assert await verify_password(user.clean_password, user.password)
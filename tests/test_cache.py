@@ -0,0 +1,98 @@
+from freezegun import freeze_time
+
+from fast_zero.cache import ExpiringDict, TTLCache, Versions
+
+
+def test_cache_returns_stored_value():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+
+
+def test_cache_entry_expires_after_ttl():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    with freeze_time("2025-01-01 10:00:00") as frozen:
+        cache.set("key", "value")
+        frozen.tick(61)
+
+        assert cache.get("key") is None
+
+
+def test_cache_entry_ttl_is_capped_by_cache_ttl():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    with freeze_time("2025-01-01 10:00:00") as frozen:
+        cache.set("short", "value", ttl=10)
+        cache.set("long", "value", ttl=3600)
+        frozen.tick(30)
+
+        assert cache.get("short") is None
+        assert cache.get("long") == "value"
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", "first")
+    cache.set("b", "second")
+    cache.get("a")
+    cache.set("c", "third")
+
+    assert cache.get("a") == "first"
+    assert cache.get("b") is None
+    assert cache.get("c") == "third"
+
+
+def test_cache_pop_removes_entry():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("key", "value")
+
+    assert cache.pop("key") == "value"
+    assert cache.pop("key") is None
+    assert len(cache) == 0
+
+
+def test_versions_bump_per_key():
+    expected_version = 2
+    versions = Versions()
+    versions.bump("a")
+    versions.bump("a")
+
+    assert versions.get("a") == expected_version
+    assert versions.get("b") == 0
+
+
+def test_versions_clear_starts_a_new_epoch():
+    versions = Versions()
+    epoch = versions.epoch
+    versions.bump("a")
+
+    versions.clear()
+
+    assert versions.get("a") == 0
+    assert versions.epoch != epoch
+
+
+def test_expiring_dict_is_not_bounded_by_count():
+    entries = 10_000
+    store = ExpiringDict(ttl=60)
+    for key in range(entries):
+        store.set(key, key)
+
+    assert len(store) == entries
+    assert store.get(0) == 0
+
+
+def test_expiring_dict_purges_expired_entries_on_write():
+    store = ExpiringDict(ttl=60)
+
+    with freeze_time("2025-01-01 10:00:00") as frozen:
+        store.set("old", "value")
+        frozen.tick(61)
+
+        assert store.get("old") is None
+
+        store.set("new", "value")
+
+        assert len(store) == 1
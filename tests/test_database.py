@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fast_zero.database import (
+    PoolMetrics,
+    TimedQueuePool,
+    engine_options,
+    warm_up_pool,
+)
+from fast_zero.metrics import db_pool_checkout_wait
+from fast_zero.settings import Settings
+
+
+def test_engine_options_for_postgres():
+    settings = Settings(
+        DATABASE_URL="postgresql+psycopg://app@db/app",
+        DB_POOL_SIZE=7,
+        DB_STATEMENT_TIMEOUT_MS=1500,
+        DB_PREPARE_THRESHOLD=None,
+    )
+
+    options = engine_options(settings)
+
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {
+        "options": "-c statement_timeout=1500",
+        "prepare_threshold": None,
+    }
+
+
+def test_engine_options_for_sqlite():
+    settings = Settings(DATABASE_URL="sqlite+aiosqlite:///database.db")
+
+    assert engine_options(settings) == {}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool_opens_connections(engine):
+    pool_size = 3
+    warm_engine = create_async_engine(engine.url, pool_size=pool_size)
+    metrics = PoolMetrics()
+    metrics.attach(warm_engine)
+
+    await warm_up_pool(warm_engine, pool_size)
+
+    assert metrics.connects == pool_size
+    assert metrics.checkouts == pool_size
+    assert metrics.checked_out == 0
+    assert metrics.connect_seconds > 0
+    assert warm_engine.sync_engine.pool.checkedin() == pool_size
+
+    await warm_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool_returns_opened_connections_on_failure(engine):
+    pool_size = 3
+    warm_engine = create_async_engine(engine.url, pool_size=pool_size)
+    metrics = PoolMetrics()
+    metrics.attach(warm_engine)
+    failing_attempt = 2
+    attempts = 0
+
+    @event.listens_for(warm_engine.sync_engine, "do_connect")
+    def fail_second_connect(dialect, conn_rec, cargs, cparams):
+        nonlocal attempts
+        attempts += 1
+        if attempts == failing_attempt:
+            raise ConnectionRefusedError
+
+    with pytest.raises(ConnectionRefusedError):
+        await warm_up_pool(warm_engine, pool_size)
+
+    assert metrics.checked_out == 0
+    assert warm_engine.sync_engine.pool.checkedin() == pool_size - 1
+
+    await warm_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_timed_queue_pool_records_checkout_wait(engine):
+    timed_engine = create_async_engine(engine.url, poolclass=TimedQueuePool)
+    count = _checkout_wait_count()
+
+    async with timed_engine.connect():
+        pass
+
+    assert _checkout_wait_count() == count + 1
+
+    await timed_engine.dispose()
+
+
+def _checkout_wait_count():
+    samples = dict(db_pool_checkout_wait.samples())
+    return samples.get("db_pool_checkout_wait_seconds_count", 0)
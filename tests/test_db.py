@@ -1,9 +1,12 @@
 from dataclasses import asdict
+from datetime import datetime
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import literal, select, text, tuple_
+from sqlalchemy.orm import selectinload
 
-from fast_zero.models import Todo, User
+from fast_zero.models import Todo, TodoState, User
+from fast_zero.sync import SyncTimestamp
 
 
 @pytest.mark.asyncio
@@ -14,7 +17,9 @@ async def test_db_create_user(session, mock_valid_user, mock_db_time):
         await session.commit()
 
     user = await session.scalar(
-        select(User).where(User.username == mock_valid_user["username"])
+        select(User)
+        .where(User.username == mock_valid_user["username"])
+        .options(selectinload(User.todos))
     )
 
     mock_valid_user.update(
@@ -41,7 +46,7 @@ async def test_db_create_todo(session, user, mock_db_time):
     todo = await session.scalar(select(Todo))
 
     assert asdict(todo) == dict(
-        **todo_dict, id=1, created_at=time, updated_at=time
+        **todo_dict, id=1, created_at=time, updated_at=time, version=1
     )
 
 
@@ -60,11 +65,79 @@ async def test_db_user_todo_relationship(session, user):
     await session.commit()
     await session.refresh(user)
 
-    user = await session.scalar(select(User).where(User.id == user.id))
+    user = await session.scalar(
+        select(User)
+        .where(User.id == user.id)
+        .options(selectinload(User.todos))
+    )
 
     assert user.todos == [todo]
 
 
+def _todos_list_query(user_id, state=None):
+    query = select(Todo).where(Todo.user_id == user_id)
+    if state:
+        query = query.where(Todo.state == state)
+    return query.order_by(Todo.id).limit(10)
+
+
+def _explain(session, prefix, query):
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    return session.execute(text(f"{prefix} {compiled}"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("state", [None, TodoState.done])
+async def test_todos_list_query_uses_index_on_postgres(session, state):
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    result = await _explain(session, "EXPLAIN", _todos_list_query(1, state))
+    plan = "\n".join(result.scalars())
+
+    assert "Seq Scan" not in plan
+    assert "ix_todos_user_id_" in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("state", "index"),
+    [
+        (None, "ix_todos_user_id_id"),
+        (TodoState.done, "ix_todos_user_id_state_id"),
+    ],
+)
+async def test_todos_list_query_uses_index_on_sqlite(
+    sqlite_session, state, index
+):
+    result = await _explain(
+        sqlite_session, "EXPLAIN QUERY PLAN", _todos_list_query(1, state)
+    )
+
+    assert f"USING INDEX {index}" in "\n".join(row.detail for row in result)
+
+
+@pytest.mark.asyncio
+async def test_todos_changes_query_uses_index_on_sqlite(sqlite_session):
+    since = literal(datetime(2025, 1, 1), SyncTimestamp)
+    query = (
+        select(Todo)
+        .where(
+            Todo.user_id == 1,
+            tuple_(Todo.updated_at, Todo.id) > tuple_(since, literal(0)),
+        )
+        .order_by(Todo.updated_at, Todo.id)
+        .limit(10)
+    )
+
+    result = await _explain(sqlite_session, "EXPLAIN QUERY PLAN", query)
+
+    assert "USING INDEX ix_todos_user_id_updated_at" in "\n".join(
+        row.detail for row in result
+    )
+
+
 # @pytest.mark.asyncio
 # async def test_create_todo_with_invalid_state(session, user):
 #     todo = Todo(
@@ -0,0 +1,151 @@
+import asyncio
+import json
+
+import psycopg
+import pytest
+from fastapi import status
+from sqlalchemy import update
+
+from fast_zero import events
+from fast_zero.events import (
+    Hub,
+    InMemoryBroker,
+    PostgresBroker,
+    TodoEvent,
+    event_stream,
+    hub,
+)
+from fast_zero.models import Todo
+from tests.factories import TodoFactory
+
+
+@pytest.mark.asyncio
+async def test_hub_delivers_to_the_users_subscriptions_only():
+    local_hub = Hub()
+    broker = InMemoryBroker(local_hub)
+
+    with (
+        local_hub.subscribe(1, maxsize=10) as mine,
+        local_hub.subscribe(2, maxsize=10) as theirs,
+    ):
+        await broker.publish(TodoEvent(1, "created", [10]))
+
+        assert mine.queue.get_nowait() == TodoEvent(1, "created", [10])
+        assert theirs.queue.empty()
+
+    assert len(local_hub) == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_turns_into_a_resync():
+    local_hub = Hub()
+
+    with local_hub.subscribe(1, maxsize=1) as subscription:
+        local_hub.deliver(TodoEvent(1, "created", [10]))
+        local_hub.deliver(TodoEvent(1, "created", [11]))
+        stream = event_stream(subscription, heartbeat=1)
+
+        assert await anext(stream) == ": connected\n\n"
+        assert await anext(stream) == "event: resync\ndata: {}\n\n"
+
+        local_hub.deliver(TodoEvent(1, "deleted", [10]))
+
+        assert await anext(stream) == (
+            'event: deleted\ndata: {"ids": [10]}\n\n'
+        )
+
+
+@pytest.mark.asyncio
+async def test_event_stream_sends_keep_alives_when_idle():
+    with Hub().subscribe(1, maxsize=1) as subscription:
+        stream = event_stream(subscription, heartbeat=0.01)
+        await anext(stream)
+
+        assert await anext(stream) == ": keep-alive\n\n"
+
+
+def test_postgres_broker_skips_its_own_notifications():
+    local_hub = Hub()
+    received = []
+    local_hub.listeners.append(received.append)
+    broker = PostgresBroker(local_hub, "postgresql+psycopg://app@db/app")
+    other = PostgresBroker(Hub(), "postgresql+psycopg://app@db/app")
+    event = TodoEvent(1, "updated", [10])
+
+    broker._receive(broker._payload(event))
+    broker._receive(other._payload(event))
+
+    assert received == [event]
+
+
+def test_postgres_broker_drops_ids_from_oversized_payloads():
+    broker = PostgresBroker(Hub(), "postgresql+psycopg://app@db/app")
+
+    payload = broker._payload(TodoEvent(1, "deleted", list(range(5000))))
+
+    assert json.loads(payload)["ids"] == []
+
+
+@pytest.mark.asyncio
+async def test_postgres_broker_resyncs_after_losing_the_listener(
+    monkeypatch,
+):
+    local_hub = Hub()
+    resyncs = []
+    local_hub.resync_listeners.append(lambda: resyncs.append(True))
+    broker = PostgresBroker(local_hub, "postgresql+psycopg://app@db/app")
+
+    async def lost_connection(*args, **kwargs):
+        raise psycopg.OperationalError("connection lost")
+
+    async def stop(delay):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(psycopg.AsyncConnection, "connect", lost_connection)
+    monkeypatch.setattr(events.asyncio, "sleep", stop)
+
+    with pytest.raises(asyncio.CancelledError):
+        await broker._listen()
+
+    assert resyncs == [True]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("shared_broker")
+async def test_resync_invalidates_cached_todo_pages(
+    session, client, user, token
+):
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    etag = client.get("/todos/", headers=headers).headers["ETag"]
+
+    # A write by another worker whose notification never arrived.
+    await session.execute(update(Todo).values(title="changed elsewhere"))
+    await session.commit()
+    hub.resync()
+
+    response = client.get(
+        "/todos/", headers={**headers, "If-None-Match": etag}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["todos"][0]["title"] == "changed elsewhere"
+
+
+def test_todo_writes_are_published(client, token, mock_valid_todo):
+    received = []
+    hub.listeners.append(received.append)
+    try:
+        response = client.post(
+            "/todos",
+            headers={"Authorization": f"Bearer {token}"},
+            json=mock_valid_todo,
+        )
+    finally:
+        hub.listeners.remove(received.append)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [(event.type, event.ids) for event in received] == [
+        ("created", [response.json()["id"]])
+    ]
@@ -0,0 +1,116 @@
+import asyncio
+from threading import Event
+
+import pytest
+
+from fast_zero.hashing import HashingBusy, HashingPool, calibrate_argon2
+from fast_zero.security import get_password_hash, verify_password
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_runs_function():
+    pool = HashingPool(max_workers=1)
+
+    assert await pool.run(sum, (1, 2)) == sum((1, 2))
+    assert pool.completed == 1
+    assert pool.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_reports_queue_depth():
+    pool = HashingPool(max_workers=1)
+    release = Event()
+
+    first = asyncio.ensure_future(pool.run(release.wait))
+    second = asyncio.ensure_future(pool.run(release.wait))
+    while pool.running < 1:
+        await asyncio.sleep(0.01)
+
+    assert pool.queue_depth == 1
+
+    release.set()
+    await asyncio.gather(first, second)
+
+    assert pool.queue_depth == 0
+    assert pool.running == 0
+
+
+@pytest.mark.asyncio
+async def test_password_hash_roundtrip():
+    hashed = await get_password_hash("secret")
+
+    assert await verify_password("secret", hashed)
+    assert not await verify_password("wrong", hashed)
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_queue_full():
+    pool = HashingPool(max_workers=1, max_queue=1)
+    release = Event()
+
+    first = asyncio.ensure_future(pool.run(release.wait))
+    while pool.running < 1:
+        await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HashingBusy):
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert pool.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_frees_queue_slots_of_cancelled_calls():
+    pool = HashingPool(max_workers=1, max_queue=3)
+    release = Event()
+
+    first = asyncio.ensure_future(pool.run(release.wait))
+    while pool.running < 1:
+        await asyncio.sleep(0.01)
+    queued = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    for task in queued:
+        task.cancel()
+    await asyncio.gather(*queued, return_exceptions=True)
+    depth = pool.queue_depth
+    release.set()
+    await first
+
+    assert depth == 0
+    assert await pool.run(sum, (1, 2)) == sum((1, 2))
+    assert pool.rejected == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_drops_jobs_that_waited_too_long():
+    pool = HashingPool(max_workers=1, queue_timeout=0.01)
+    release = Event()
+
+    first = asyncio.ensure_future(pool.run(release.wait))
+    while pool.running < 1:
+        await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(pool.run(sum, (1, 2)))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    await first
+    with pytest.raises(HashingBusy):
+        await second
+    assert pool.rejected == 1
+    assert pool.queue_depth == 0
+
+
+def test_calibrate_argon2_lowers_memory_for_small_targets():
+    memory_cost = 65536
+
+    time_cost, calibrated_memory, elapsed = calibrate_argon2(
+        0.001, memory_cost, parallelism=1
+    )
+
+    assert time_cost == 1
+    assert calibrated_memory < memory_cost
+    assert elapsed > 0
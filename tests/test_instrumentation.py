@@ -0,0 +1,70 @@
+import json
+import logging
+
+import pytest
+from fastapi import status
+
+from fast_zero.instrumentation import QueryStats
+
+
+def test_query_stats_tracks_slowest_statement():
+    expected_queries = 3
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.01)
+    stats.record("SELECT 2", 0.03)
+    stats.record("SELECT 1", 0.02)
+
+    assert stats.count == expected_queries
+    assert stats.slowest_statement == "SELECT 2"
+    assert stats.server_timing() == (
+        'db;dur=60.00;desc="3 queries", db-slowest;dur=30.00'
+    )
+
+
+def test_query_stats_reports_repeated_statements():
+    stats = QueryStats()
+    for _ in range(5):
+        stats.record("SELECT * FROM todos WHERE id = ?", 0.001)
+    stats.record("SELECT * FROM users", 0.001)
+
+    assert stats.repeated_statements(threshold=5) == {
+        "SELECT * FROM todos WHERE id = ?": 5
+    }
+
+
+def test_response_has_server_timing_header(client, token):
+    response = client.get(
+        "/todos", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["server-timing"]
+
+
+def test_request_is_logged_with_query_stats(client, token, caplog):
+    expected_queries = 2
+    with caplog.at_level(logging.INFO, logger="fast_zero.instrumentation"):
+        client.get("/todos", headers={"Authorization": f"Bearer {token}"})
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == "/todos/"
+    assert record["status"] == status.HTTP_200_OK
+    assert record["db_queries"] == expected_queries
+    assert record["db_slowest_statement"].startswith("SELECT")
+
+
+def test_list_todos_stays_within_query_budget(client, token, query_budget):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with query_budget(2):
+        client.get("/todos/", headers=headers)
+
+    with query_budget(1):
+        client.get("/todos/", headers=headers)
+
+
+def test_query_budget_fails_when_exceeded(client, token, query_budget):
+    with pytest.raises(pytest.fail.Exception, match="budget was 0"):
+        with query_budget(0):
+            client.get("/todos/", headers={"Authorization": f"Bearer {token}"})
@@ -0,0 +1,58 @@
+from fastapi import status
+
+from fast_zero.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(
+        Histogram(
+            "latency_seconds", "Latency.", labels=("route",), buckets=(0.1, 1)
+        )
+    )
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_counter_and_gauge_samples():
+    registry = Registry()
+    counter = registry.register(
+        Counter("requests_total", "Requests.", labels=("path",))
+    )
+    registry.register(Gauge("queue", "Queue.", callback=lambda: 7))
+    counter.inc('/"quoted"')
+    counter.inc('/"quoted"')
+
+    rendered = registry.render()
+
+    assert 'requests_total{path="/\\"quoted\\""} 2' in rendered
+    assert "queue 7" in rendered
+
+
+def test_metrics_endpoint_reports_route_templates(client, user, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.patch("/todos/10", headers=headers, json={})
+    client.get("/not-a-route")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="PATCH",route="/todos/{todo_id}",'
+        'status="404"}'
+    ) in response.text
+    assert 'route="unmatched"' in response.text
+    assert "password_hash_queue_seconds_count" in response.text
+    assert "db_pool_checkouts_total" in response.text
@@ -0,0 +1,48 @@
+import pytest
+from freezegun import freeze_time
+
+from fast_zero.ratelimit import InMemoryRateLimitBackend, RateLimiter
+
+BURST = 2
+PER_MINUTE = 6
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_allows_burst_then_rejects():
+    limiter = RateLimiter(
+        InMemoryRateLimitBackend(100), "test", BURST, PER_MINUTE
+    )
+
+    with freeze_time("2025-01-01 00:00:00"):
+        assert await limiter.hit("alice") == 0
+        assert await limiter.hit("alice") == 0
+        assert await limiter.hit("alice") == pytest.approx(10)
+        assert await limiter.hit("bob") == 0
+
+    assert limiter.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_refills_over_time():
+    limiter = RateLimiter(
+        InMemoryRateLimitBackend(100), "test", BURST, PER_MINUTE
+    )
+
+    with freeze_time("2025-01-01 00:00:00") as frozen:
+        for _ in range(BURST):
+            await limiter.hit("alice")
+        assert await limiter.hit("alice")
+
+        frozen.tick(10)
+        assert await limiter.hit("alice") == 0
+        assert await limiter.hit("alice")
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_backend_evicts_least_recently_used():
+    backend = InMemoryRateLimitBackend(2)
+
+    for key in ("a", "b", "c"):
+        await backend.take(key, BURST, 1)
+
+    assert len(backend) == BURST
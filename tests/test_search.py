@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import select, text
+
+from fast_zero.models import Todo, TodoState, User
+from fast_zero.search import (
+    get_search_backend,
+    like_search,
+    pg_trgm_search,
+    sqlite_fts_search,
+)
+
+
+@pytest.mark.parametrize(
+    ("dialect_name", "backend"),
+    [
+        ("postgresql", pg_trgm_search),
+        ("sqlite", sqlite_fts_search),
+        ("mysql", like_search),
+    ],
+)
+def test_get_search_backend_by_dialect(dialect_name, backend):
+    assert get_search_backend(dialect_name) is backend
+
+
+@pytest.mark.asyncio
+async def test_sqlite_fts_search_follows_todo_changes(sqlite_session):
+    user = User(username="alice", email="alice@test.com", password="secret")
+    sqlite_session.add(user)
+    await sqlite_session.flush()
+
+    kept = Todo("Buy MILK", "groceries", TodoState.todo, user_id=user.id)
+    renamed = Todo("milk the cow", "farm", TodoState.todo, user_id=user.id)
+    deleted = Todo("milkshake", "treat", TodoState.todo, user_id=user.id)
+    sqlite_session.add_all([kept, renamed, deleted])
+    await sqlite_session.commit()
+
+    renamed.title = "feed the cow"
+    await sqlite_session.delete(deleted)
+    await sqlite_session.commit()
+
+    todos = await sqlite_session.scalars(
+        sqlite_fts_search(select(Todo), Todo.title, "milk")
+    )
+
+    assert todos.all() == [kept]
+
+
+@pytest.mark.asyncio
+async def test_pg_trgm_search_uses_trigram_index(session):
+    available = await session.scalar(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    )
+    if not available:
+        pytest.skip("pg_trgm is not available on this server")
+
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    query = pg_trgm_search(select(Todo), Todo.title, "milk")
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+
+    result = await session.execute(text(f"EXPLAIN {compiled}"))
+
+    assert "ix_todos_title_trgm" in "\n".join(result.scalars())
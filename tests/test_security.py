@@ -1,7 +1,19 @@
+import pytest
 from fastapi import status
-from jwt import decode
-
-from fast_zero.security import create_access_token, settings
+from freezegun import freeze_time
+from jwt import ExpiredSignatureError, decode
+
+from fast_zero import security
+from fast_zero.models import Todo
+from fast_zero.security import (
+    Principal,
+    create_access_token,
+    principal_cache,
+    revoked_tokens,
+    settings,
+    token_verifier,
+)
+from tests.factories import TodoFactory
 
 
 def test_access_token():
@@ -13,7 +25,39 @@ def test_access_token():
     )
 
     assert decoded["test"] == data["test"]
-    assert "exp" in decoded
+    assert decoded["exp"] - decoded["iat"] == (
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+def test_token_verifier_skips_decoding_known_tokens(monkeypatch):
+    token = create_access_token({"sub": "alice"})
+    payload = token_verifier.verify(token)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("decoded twice")
+
+    monkeypatch.setattr(security, "decode", fail)
+
+    assert token_verifier.verify(token) == payload
+
+
+def test_token_verifier_forgets_tokens_when_they_expire():
+    with freeze_time("2025-01-01 10:00:00") as frozen:
+        token = create_access_token({"sub": "alice"})
+        token_verifier.verify(token)
+        frozen.tick(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 1)
+
+        with pytest.raises(ExpiredSignatureError):
+            token_verifier.verify(token)
+
+
+def test_login_token_carries_the_user_id(client, user, token):
+    payload = decode(
+        token, settings.SECRET_KEY, algorithms=(settings.ALGORITHM,)
+    )
+
+    assert payload["uid"] == user.id
 
 
 def test_invalid_token(client):
@@ -47,3 +91,120 @@ def test_current_user_not_found_in_db(client):
 
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
     assert response.json() == {"detail": "Could not validate credentials"}
+
+
+def test_current_user_is_cached_after_first_request(client, user, token):
+    response = client.get(
+        "/todos", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert principal_cache.get(user.username) == Principal(
+        id=user.id, username=user.username
+    )
+
+
+def test_cached_current_user_is_invalidated_on_rename(
+    client, user, token, mock_valid_updated_user
+):
+    client.get("/todos", headers={"Authorization": f"Bearer {token}"})
+
+    response = client.put(
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json=mock_valid_updated_user,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert principal_cache.get(user.username) is None
+
+    response = client.get(
+        "/todos", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json() == {"detail": "Could not validate credentials"}
+
+
+def test_cached_current_user_is_invalidated_on_delete(client, user, token):
+    client.get("/todos", headers={"Authorization": f"Bearer {token}"})
+
+    response = client.delete(
+        f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = client.get(
+        "/todos", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_current_user_does_not_load_todos(
+    session, client, user, token, query_counter
+):
+    session.add_all(TodoFactory.create_batch(20, user_id=user.id))
+    await session.commit()
+
+    with query_counter() as counter:
+        response = client.post(
+            "/auth/refresh", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(counter.statements) == 1
+    assert counter.rows == 1
+    assert Todo.__tablename__ not in counter.statements[0]
+
+    with query_counter() as counter:
+        client.post(
+            "/auth/refresh", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert counter.statements == []
+
+
+def test_todo_routes_trust_token_claims_when_enabled(
+    client, user, token, query_counter, monkeypatch
+):
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+
+    with query_counter() as counter:
+        response = client.get(
+            "/todos", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert not any("FROM users" in sql for sql in counter.statements)
+
+
+def test_trusted_token_claims_are_revoked_on_delete(
+    client, user, token, monkeypatch
+):
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.delete(f"/users/{user.id}", headers=headers)
+    response = client.get("/todos", headers=headers)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_trusted_token_of_user_deleted_elsewhere_cannot_write(
+    client, user, token, monkeypatch
+):
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    headers = {"Authorization": f"Bearer {token}"}
+    client.delete(f"/users/{user.id}", headers=headers)
+    # The deletion was handled by another worker, which revoked there.
+    revoked_tokens.clear()
+
+    response = client.post(
+        "/todos",
+        headers=headers,
+        json={"title": "Test", "description": "Test", "state": "draft"},
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json() == {"detail": "Could not validate credentials"}
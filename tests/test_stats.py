@@ -0,0 +1,69 @@
+import pytest
+from fastapi import status
+from sqlalchemy import update
+
+from fast_zero.models import TodoCount, TodoState
+from fast_zero.stats import find_mismatches, rebuild_counts
+
+
+@pytest.mark.asyncio
+async def test_todo_writes_keep_counters_in_sync(session, client, user, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    todo = {"title": "t", "description": "d", "state": "todo"}
+
+    first = client.post("/todos", headers=headers, json=todo).json()
+    created = client.post(
+        "/todos/bulk",
+        headers=headers,
+        json={"todos": [todo, {**todo, "state": "doing"}, todo]},
+    ).json()["todos"]
+    client.patch(
+        f"/todos/{first['id']}", headers=headers, json={"state": "done"}
+    )
+    client.patch(
+        "/todos/bulk",
+        headers=headers,
+        json={"todos": [{"id": created[0]["id"], "state": "trash"}]},
+    )
+    client.delete(f"/todos/{created[1]['id']}", headers=headers)
+    client.request(
+        "DELETE",
+        "/todos/bulk",
+        headers=headers,
+        json={"ids": [created[2]["id"]]},
+    )
+    client.post(
+        "/todos/import",
+        headers=headers,
+        content='{"title": "a", "description": "b", "state": "draft"}\n',
+    )
+
+    response = client.get("/todos/stats", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "counts": {"draft": 1, "todo": 0, "doing": 0, "done": 1, "trash": 1},
+        "total": 3,
+    }
+    assert await find_mismatches(session) == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_counts_repairs_drifted_counters(
+    session, client, user, token
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post(
+        "/todos",
+        headers=headers,
+        json={"title": "t", "description": "d", "state": "todo"},
+    )
+    await session.execute(update(TodoCount).values(count=TodoCount.count + 5))
+    await session.commit()
+
+    assert await find_mismatches(session) == [(user.id, TodoState.todo, 6, 1)]
+
+    await rebuild_counts(session)
+    await session.commit()
+
+    assert await find_mismatches(session) == []
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+
+from fast_zero.models import Todo, TodoState, TodoTombstone, User
+from fast_zero.routers.todos import PUBLIC_COLUMNS
+from fast_zero.sync import (
+    decode_change_cursor,
+    encode_change_cursor,
+    fetch_changes,
+)
+
+
+def test_change_cursor_round_trip():
+    changed_at = datetime(2025, 1, 1, 10, 30, 15, 123456)
+    cursor = encode_change_cursor(changed_at, 42)
+
+    assert decode_change_cursor(cursor) == (changed_at, 42)
+
+
+def test_decode_change_cursor_rejects_garbage():
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_change_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pages_through_todos_sharing_a_timestamp(sqlite_session):
+    user = User(username="alice", email="alice@test.com", password="secret")
+    sqlite_session.add(user)
+    await sqlite_session.flush()
+
+    # CURRENT_TIMESTAMP has second resolution, so these share a timestamp.
+    todos = [
+        Todo(f"todo {i}", "", TodoState.todo, user_id=user.id)
+        for i in range(5)
+    ]
+    sqlite_session.add_all(todos)
+    await sqlite_session.commit()
+
+    seen, since = [], encode_change_cursor(datetime(2000, 1, 1), 0)
+    for _ in todos:
+        page = await fetch_changes(
+            sqlite_session, user.id, PUBLIC_COLUMNS, since, limit=2
+        )
+        seen.extend(todo.id for todo in page["todos"])
+        since = page["next_cursor"]
+        if not page["has_more"]:
+            break
+
+    assert seen == [todo.id for todo in todos]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_reports_tombstones_after_the_cursor(sqlite_session):
+    user = User(username="alice", email="alice@test.com", password="secret")
+    sqlite_session.add(user)
+    await sqlite_session.flush()
+    sqlite_session.add(TodoTombstone(todo_id=7, user_id=user.id))
+    await sqlite_session.commit()
+
+    since = encode_change_cursor(datetime(2000, 1, 1), 0)
+    page = await fetch_changes(
+        sqlite_session, user.id, PUBLIC_COLUMNS, since, limit=2
+    )
+
+    assert page["deleted"] == [7]
+    assert page["todos"] == []
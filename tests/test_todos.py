@@ -1,18 +1,15 @@
-import factory.fuzzy
+import csv
+import io
+import json
+
 import pytest
 from fastapi import status
+from sqlalchemy import select, update
 
 from fast_zero.models import Todo, TodoState
-
-
-class TodoFactory(factory.Factory):
-    class Meta:
-        model = Todo
-
-    title = factory.Faker("text")
-    description = factory.Faker("text")
-    state = factory.fuzzy.FuzzyChoice(TodoState)
-    user_id = 1
+from fast_zero.routers import todos
+from fast_zero.schemas import TodoPublic
+from tests.factories import TodoFactory
 
 
 def test_create_valid_todo(client, token, mock_valid_todo, mock_db_time):
@@ -27,7 +24,11 @@ def test_create_valid_todo(client, token, mock_valid_todo, mock_db_time):
 
         assert response.status_code == status.HTTP_201_CREATED
         assert response.json() == dict(
-            **mock_valid_todo, id=1, created_at=iso_time, updated_at=iso_time
+            **mock_valid_todo,
+            id=1,
+            created_at=iso_time,
+            updated_at=iso_time,
+            version=1,
         )
 
 
@@ -61,6 +62,63 @@ async def test_get_todos_pagination_should_return_2_todos(
     assert len(response.json()["todos"]) == expected_todos
 
 
+@pytest.mark.asyncio
+async def test_get_todos_cursor_pagination_should_walk_all_todos(
+    session, user, client, token
+):
+    expected_todos = 5
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    seen_ids = []
+    url = "/todos?limit=2"
+    while url:
+        response = client.get(
+            url, headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        data = response.json()
+        seen_ids.extend(todo["id"] for todo in data["todos"])
+        next_cursor = data.get("next_cursor")
+        url = next_cursor and f"/todos?limit=2&cursor={next_cursor}"
+
+    assert len(seen_ids) == expected_todos
+    assert seen_ids == sorted(set(seen_ids))
+
+
+@pytest.mark.asyncio
+async def test_get_todos_last_page_has_no_next_cursor(
+    session, user, client, token
+):
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        "/todos?limit=2", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "next_cursor" not in response.json()
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_get_todos_with_non_positive_limit(client, token, limit):
+    response = client.get(
+        f"/todos?limit={limit}", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_todos_with_invalid_cursor(client, token):
+    response = client.get(
+        "/todos?cursor=invalid", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_get_todos_filter_title_should_return_5_todos(
     session, user, client, token
@@ -179,10 +237,82 @@ async def test_get_todos_should_return_all_expected_fields(
             "id": 1,
             "created_at": time.isoformat(),
             "updated_at": time.isoformat(),
+            "version": 1,
         }
     ]
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("shared_broker")
+async def test_get_todos_not_modified_skips_the_list_query(
+    session, user, client, token, query_counter
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/todos", headers=headers)
+    etag = response.headers["ETag"]
+
+    with query_counter() as counter:
+        response = client.get(
+            "/todos", headers={**headers, "If-None-Match": etag}
+        )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert not response.content
+    assert not any("FROM todos" in sql for sql in counter.statements)
+
+
+@pytest.mark.usefixtures("shared_broker")
+def test_get_todos_etag_changes_after_a_write(client, token, mock_valid_todo):
+    headers = {"Authorization": f"Bearer {token}"}
+    etag = client.get("/todos", headers=headers).headers["ETag"]
+
+    client.post("/todos", headers=headers, json=mock_valid_todo)
+    response = client.get("/todos", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["todos"]) == 1
+
+
+@pytest.mark.usefixtures("shared_broker")
+def test_get_todos_etag_depends_on_filters(client, token):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    etag = client.get("/todos", headers=headers).headers["ETag"]
+    response = client.get(
+        "/todos?state=done", headers={**headers, "If-None-Match": etag}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_get_todos_without_shared_broker_sees_writes_elsewhere(
+    session, user, client, token
+):
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    etag = client.get("/todos", headers=headers).headers["ETag"]
+    unchanged = client.get(
+        "/todos", headers={**headers, "If-None-Match": etag}
+    )
+
+    # A write by another worker, which the in-memory broker never relays.
+    await session.execute(update(Todo).values(title="changed elsewhere"))
+    await session.commit()
+    response = client.get("/todos", headers={**headers, "If-None-Match": etag})
+
+    assert unchanged.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["todos"][0]["title"] == "changed elsewhere"
+
+
 @pytest.mark.asyncio
 async def test_patch_valid_todo(session, client, user, token):
     todo = TodoFactory(user_id=user.id)
@@ -231,3 +361,475 @@ def test_delete_todo_that_does_not_exist_or_does_not_belong_to_current_user(
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.json() == {"detail": "Task not found"}
+
+
+def test_bulk_create_todos(client, token, mock_valid_todo):
+    expected_todos = 3
+    response = client.post(
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"todos": [mock_valid_todo] * expected_todos},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    todos = response.json()["todos"]
+    assert len(todos) == expected_todos
+    assert [todo["id"] for todo in todos] == [1, 2, 3]
+    assert todos[0]["title"] == mock_valid_todo["title"]
+
+
+def test_bulk_create_todos_rejects_empty_batch(client, token):
+    response = client.post(
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"todos": []},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_todos(session, client, user, other_user, token):
+    todo = TodoFactory(user_id=user.id, state=TodoState.draft)
+    foreign_todo = TodoFactory(user_id=other_user.id)
+    session.add_all([todo, foreign_todo])
+    await session.commit()
+
+    response = client.patch(
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "todos": [
+                {"id": todo.id, "title": "bulk title", "state": "done"},
+                {"id": foreign_todo.id, "title": "hijacked"},
+                {"id": 999, "title": "missing"},
+            ]
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "results": [
+            {"id": todo.id, "status": "updated"},
+            {"id": foreign_todo.id, "status": "not_found"},
+            {"id": 999, "status": "not_found"},
+        ]
+    }
+
+    await session.refresh(todo)
+    await session.refresh(foreign_todo)
+    assert todo.title == "bulk title"
+    assert todo.state == TodoState.done
+    assert todo.version == 1 + 1
+    assert foreign_todo.title != "hijacked"
+    assert foreign_todo.version == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_todos(session, client, user, other_user, token):
+    todo = TodoFactory(user_id=user.id)
+    foreign_todo = TodoFactory(user_id=other_user.id)
+    session.add_all([todo, foreign_todo])
+    await session.commit()
+
+    response = client.request(
+        "DELETE",
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"ids": [todo.id, foreign_todo.id]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "results": [
+            {"id": todo.id, "status": "deleted"},
+            {"id": foreign_todo.id, "status": "not_found"},
+        ]
+    }
+    assert await session.scalar(select(Todo.id)) == foreign_todo.id
+
+
+def test_create_todo_runs_a_single_insert_and_a_counter_upsert(
+    client, token, mock_valid_todo, query_counter
+):
+    expected_queries = 2
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/auth/refresh", headers=headers)
+
+    with query_counter() as counter:
+        response = client.post("/todos", headers=headers, json=mock_valid_todo)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["created_at"]
+    assert len(counter.statements) == expected_queries
+    assert counter.statements[0].startswith("INSERT INTO todos")
+    assert "RETURNING" in counter.statements[0]
+    assert counter.statements[1].startswith("INSERT INTO todo_counts")
+
+
+@pytest.mark.asyncio
+async def test_patch_todo_does_not_reload_after_update(
+    session, client, user, token, query_counter
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/auth/refresh", headers=headers)
+
+    with query_counter() as counter:
+        response = client.patch(
+            f"/todos/{todo.id}", headers=headers, json={"title": "new"}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["updated_at"]
+    assert len(counter.statements) == 1
+    assert counter.statements[-1].startswith("UPDATE todos")
+    assert "RETURNING" in counter.statements[-1]
+
+
+@pytest.mark.asyncio
+async def test_patch_todo_state_locks_the_row_for_the_counters(
+    session, client, user, token, query_counter
+):
+    todo = TodoFactory(user_id=user.id, state="todo")
+    session.add(todo)
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/auth/refresh", headers=headers)
+
+    with query_counter() as counter:
+        response = client.patch(
+            f"/todos/{todo.id}", headers=headers, json={"state": "done"}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["state"] == "done"
+    select_state, update_todo, upsert_counts = counter.statements
+    assert select_state.rstrip().endswith("FOR UPDATE")
+    assert update_todo.startswith("UPDATE todos")
+    assert upsert_counts.startswith("INSERT INTO todo_counts")
+
+
+@pytest.mark.asyncio
+async def test_patch_todo_with_if_match(session, client, user, token):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    etag = client.patch(
+        f"/todos/{todo.id}", headers=headers, json={"title": "first"}
+    ).headers["ETag"]
+
+    response = client.patch(
+        f"/todos/{todo.id}",
+        headers={**headers, "If-Match": etag},
+        json={"title": "second"},
+    )
+    stale = client.patch(
+        f"/todos/{todo.id}",
+        headers={**headers, "If-Match": etag},
+        json={"title": "third"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "second"
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert stale.json() == {"detail": "Task was modified"}
+    await session.refresh(todo)
+    assert todo.title == "second"
+
+
+@pytest.mark.asyncio
+async def test_delete_todo_with_if_match(session, client, user, token):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    stale = client.delete(
+        f"/todos/{todo.id}", headers={**headers, "If-Match": '"2"'}
+    )
+    response = client.delete(
+        f"/todos/{todo.id}",
+        headers={**headers, "If-Match": str(todo.version)},
+    )
+
+    assert stale.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+def test_if_match_rejects_second_patch_in_the_same_second(
+    sqlite_client, mock_valid_user
+):
+    client = sqlite_client
+    headers = _sqlite_auth_headers(client, mock_valid_user)
+    todo = client.post(
+        "/todos/",
+        headers=headers,
+        json={"title": "t", "description": "d", "state": "todo"},
+    ).json()
+    seen = {**headers, "If-Match": str(todo["version"])}
+
+    first = client.patch(
+        f"/todos/{todo['id']}", headers=seen, json={"title": "first"}
+    )
+    second = client.patch(
+        f"/todos/{todo['id']}", headers=seen, json={"title": "second"}
+    )
+
+    # SQLite stores updated_at to the second, so back-to-back edits
+    # usually share it; the version still tells them apart.
+    assert first.headers["ETag"] == '"2"'
+    assert second.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+def _sqlite_auth_headers(client, user):
+    client.post("/users/", json=user)
+    token = client.post(
+        "/auth/token",
+        data={"username": user["username"], "password": user["password"]},
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_patch_and_delete_todo_on_sqlite(sqlite_client, mock_valid_user):
+    client = sqlite_client
+    headers = _sqlite_auth_headers(client, mock_valid_user)
+    todo = client.post(
+        "/todos/",
+        headers=headers,
+        json={"title": "t", "description": "d", "state": "todo"},
+    ).json()
+    other = client.post(
+        "/todos/",
+        headers=headers,
+        json={"title": "t", "description": "d", "state": "todo"},
+    ).json()
+
+    patched = client.patch(
+        f"/todos/{todo['id']}",
+        headers={**headers, "If-Match": str(todo["version"])},
+        json={"state": "done"},
+    )
+    deleted = client.delete(
+        f"/todos/{other['id']}",
+        headers={**headers, "If-Match": str(other["version"])},
+    )
+    missing = client.delete(f"/todos/{other['id']}", headers=headers)
+
+    assert patched.status_code == status.HTTP_200_OK
+    assert deleted.status_code == status.HTTP_204_NO_CONTENT
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/todos/stats", headers=headers).json()["counts"] == {
+        "draft": 0,
+        "todo": 0,
+        "doing": 0,
+        "done": 1,
+        "trash": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_todos_as_ndjson(
+    session, client, user, other_user, token
+):
+    expected_todos = 3
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.commit()
+
+    response = client.get(
+        "/todos/export", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    todos = [json.loads(line) for line in response.text.splitlines()]
+    assert len(todos) == expected_todos
+    assert set(todos[0]) == set(TodoPublic.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_export_todos_as_csv(session, client, user, token):
+    todo = TodoFactory(user_id=user.id, title="with, comma")
+    session.add(todo)
+    await session.commit()
+
+    response = client.get(
+        "/todos/export?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "with, comma"
+    assert rows[0]["state"] == todo.state
+
+
+def test_export_todos_without_todos(client, token):
+    response = client.get(
+        "/todos/export?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text.strip() == ",".join(TodoPublic.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_without_cursor_returns_every_todo(
+    session, client, user, token
+):
+    expected_todos = 3
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        "/todos/changes", headers={"Authorization": f"Bearer {token}"}
+    )
+    data = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(data["todos"]) == expected_todos
+    assert data["deleted"] == []
+    assert data["has_more"] is False
+    assert data["next_cursor"]
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_pages_through_todos_sharing_a_timestamp(
+    session, client, user, token, mock_db_time
+):
+    todos = TodoFactory.create_batch(5, user_id=user.id)
+    with mock_db_time(model=Todo):
+        session.add_all(todos)
+        await session.commit()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    seen, url = [], "/todos/changes?limit=2"
+    while url:
+        data = client.get(url, headers=headers).json()
+        seen.extend(todo["id"] for todo in data["todos"])
+        url = data["has_more"] and (
+            f"/todos/changes?limit=2&since={data['next_cursor']}"
+        )
+
+    assert seen == [todo.id for todo in todos]
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_reports_updates_and_deletions(
+    session, client, user, token, mock_db_time
+):
+    kept, deleted = TodoFactory.create_batch(2, user_id=user.id)
+    with mock_db_time(model=Todo):
+        session.add_all([kept, deleted])
+        await session.commit()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    since = client.get("/todos/changes", headers=headers).json()["next_cursor"]
+
+    client.patch(f"/todos/{kept.id}", headers=headers, json={"title": "new"})
+    client.delete(f"/todos/{deleted.id}", headers=headers)
+    response = client.get(f"/todos/changes?since={since}", headers=headers)
+    data = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [todo["title"] for todo in data["todos"]] == ["new"]
+    assert data["deleted"] == [deleted.id]
+
+
+def test_todo_changes_with_invalid_cursor(client, token):
+    response = client.get(
+        "/todos/changes?since=invalid",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_todo_changes_with_zero_limit(client, token):
+    response = client.get(
+        "/todos/changes?limit=0",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_import_todos_from_ndjson(client, token, mock_valid_todo):
+    lines = [json.dumps(mock_valid_todo)] * 3 + ['{"title": "no state"}']
+
+    response = client.post(
+        "/todos/import",
+        headers={"Authorization": f"Bearer {token}"},
+        content="\n".join(lines),
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "imported": 3,
+        "failed": 1,
+        "errors": [
+            {
+                "line": 4,
+                "detail": "description: Field required; state: Field required",
+            }
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_import_todos_from_exported_csv(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    exported = client.get("/todos/export?format=csv", headers=headers)
+
+    response = client.post(
+        "/todos/import?format=csv", headers=headers, content=exported.text
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+    todos = (await session.scalars(select(Todo).order_by(Todo.id))).all()
+    assert [todo.title for todo in todos[2:]] == [
+        todo.title for todo in todos[:2]
+    ]
+
+
+def test_import_todos_reports_unterminated_csv_record(client, token):
+    response = client.post(
+        "/todos/import?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+        content=(
+            "title,description,state\n"
+            "ok,fine,todo\n"
+            'a,"oops,todo\n'
+            "b,c,todo\n"
+            "d,e,done\n"
+        ),
+    )
+
+    assert response.json() == {
+        "imported": 1,
+        "failed": 1,
+        "errors": [{"line": 3, "detail": "Unterminated quoted field"}],
+    }
+
+
+def test_import_todos_in_batches(client, token, mock_valid_todo, monkeypatch):
+    monkeypatch.setattr(todos.settings, "TODO_IMPORT_BATCH_SIZE", 2)
+    lines = [json.dumps(mock_valid_todo)] * 5
+
+    response = client.post(
+        "/todos/import",
+        headers={"Authorization": f"Bearer {token}"},
+        content="\n".join(lines),
+    )
+
+    assert response.json()["imported"] == len(lines)
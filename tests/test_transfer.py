@@ -0,0 +1,76 @@
+import pytest
+
+from fast_zero.transfer import MalformedRecord, iter_csv_records, iter_lines
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_across_chunk_boundaries():
+    chunks = _chunks(b'{"a": 1}\n{"b"', b": 2}\n\n\xc3", b"\xa9")
+
+    assert await _collect(iter_lines(chunks)) == [
+        (1, '{"a": 1}'),
+        (2, '{"b": 2}'),
+        (4, "é"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_csv_records_with_multiline_field():
+    chunks = _chunks(
+        b"title,description,state\n",
+        b'first,"two\nlines",todo\n',
+        b'second,"with ""quotes""",done\n',
+    )
+
+    assert await _collect(iter_csv_records(chunks)) == [
+        (2, {"title": "first", "description": "two\nlines", "state": "todo"}),
+        (
+            4,
+            {
+                "title": "second",
+                "description": 'with "quotes"',
+                "state": "done",
+            },
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_csv_records_keeps_blank_lines_in_quoted_fields():
+    chunks = _chunks(
+        b"title,description,state\n\n",
+        b'first,"one\n\nthree",todo\n\n',
+        b"second,plain,done\n",
+    )
+
+    assert await _collect(iter_csv_records(chunks)) == [
+        (
+            3,
+            {"title": "first", "description": "one\n\nthree", "state": "todo"},
+        ),
+        (7, {"title": "second", "description": "plain", "state": "done"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_csv_records_reports_malformed_records():
+    chunks = _chunks(
+        b"title,description,state\n",
+        b'"bad"x,d,todo\n',
+        b'a,"oops,todo\nb,c,todo\n',
+    )
+
+    records = await _collect(iter_csv_records(chunks))
+
+    assert [line for line, _ in records] == [2, 3]
+    assert all(isinstance(record, MalformedRecord) for _, record in records)
+    assert str(records[1][1]) == "Unterminated quoted field"
@@ -1,6 +1,13 @@
+import pytest
 from fastapi import status
+from sqlalchemy import delete, select, update
 
+from fast_zero.models import Todo, TodoCount, TodoTombstone, User
+from fast_zero.ratelimit import signup_ip_limiter
+from fast_zero.routers import users
 from fast_zero.schemas import UserPublic
+from fast_zero.security import Principal, principal_cache, verify_password
+from tests.factories import TodoFactory, UserFactory
 
 
 def test_create_user(client, mock_valid_user):
@@ -14,17 +21,27 @@ def test_create_user(client, mock_valid_user):
     }
 
 
+@pytest.fixture(params=["client", "sqlite_client"])
+def any_client(request):
+    return request.getfixturevalue(request.param)
+
+
 def test_create_user_with_username_that_already_exists(
-    client, mock_valid_user
+    any_client, mock_valid_user
 ):
+    client = any_client
     client.post("/users/", json=mock_valid_user)
+    mock_valid_user["email"] = "other@example.com"
     same_user_response = client.post("/users/", json=mock_valid_user)
 
     assert same_user_response.status_code == status.HTTP_409_CONFLICT
     assert same_user_response.json() == {"detail": "Username already exists"}
 
 
-def test_create_user_with_email_that_already_exists(client, mock_valid_user):
+def test_create_user_with_email_that_already_exists(
+    any_client, mock_valid_user
+):
+    client = any_client
     client.post("/users/", json=mock_valid_user)
 
     mock_valid_user["username"] = "any"
@@ -50,6 +67,49 @@ def test_read_users(client, user):
     assert response.json() == {"users": [user_schema]}
 
 
+def test_read_users_with_cursor(client, user, other_user):
+    response = client.get("/users/?limit=1")
+    data = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [u["id"] for u in data["users"]] == [user.id]
+
+    response = client.get(f"/users/?limit=1&cursor={data['next_cursor']}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "users": [UserPublic.model_validate(other_user).model_dump()]
+    }
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_read_users_with_non_positive_limit(any_client, limit):
+    response = any_client.get(f"/users/?limit={limit}")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_read_users_does_not_load_password_hashes(client, user, query_counter):
+    with query_counter() as counter:
+        response = client.get("/users/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(counter.statements) == 1
+    assert "password" not in counter.statements[0]
+
+
+def test_read_users_fast_json_matches_default_serialization(
+    client, user, other_user, monkeypatch
+):
+    default = client.get("/users/?limit=1")
+
+    monkeypatch.setattr(users.settings, "FAST_JSON_RESPONSES", True)
+    fast = client.get("/users/?limit=1")
+
+    assert fast.status_code == status.HTTP_200_OK
+    assert fast.json() == default.json()
+
+
 def test_read_user(client, user):
     user_schema = UserPublic.model_validate(user).model_dump()
     response = client.get("/users/1/")
@@ -58,6 +118,51 @@ def test_read_user(client, user):
     assert response.json() == user_schema
 
 
+def test_read_user_not_modified(client, user, query_counter):
+    etag = client.get(f"/users/{user.id}").headers["ETag"]
+
+    with query_counter() as counter:
+        response = client.get(
+            f"/users/{user.id}", headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+    assert len(counter.statements) == 1
+    assert "password" not in counter.statements[0]
+
+
+@pytest.mark.asyncio
+async def test_read_user_etag_changes_after_update_elsewhere(
+    client, session, user
+):
+    etag = client.get(f"/users/{user.id}").headers["ETag"]
+
+    # An update handled by another worker.
+    await session.execute(update(User).values(username="renamed"))
+    await session.commit()
+    response = client.get(f"/users/{user.id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["username"] == "renamed"
+
+
+def test_read_user_etag_changes_after_update(
+    client, user, mock_valid_updated_user, token
+):
+    etag = client.get(f"/users/{user.id}").headers["ETag"]
+    client.put(
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json=mock_valid_updated_user,
+    )
+
+    response = client.get(f"/users/{user.id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["username"] == mock_valid_updated_user["username"]
+
+
 def test_read_user_that_does_not_exist(client):
     response = client.get("/users/0/")
 
@@ -80,6 +185,44 @@ def test_update_user(client, user, mock_valid_updated_user, token):
     }
 
 
+@pytest.mark.asyncio
+async def test_update_user_keeps_hash_of_unchanged_password(
+    client, session, user, token
+):
+    old_hash = user.password
+
+    response = client.put(
+        f"/users/{user.id}/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "username": "renamed",
+            "email": user.email,
+            "password": user.clean_password,
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    await session.refresh(user)
+    assert user.password == old_hash
+
+
+@pytest.mark.asyncio
+async def test_update_user_hashes_new_password(client, session, user, token):
+    response = client.put(
+        f"/users/{user.id}/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "username": user.username,
+            "email": user.email,
+            "password": "new-password",
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    await session.refresh(user)
+    assert await verify_password("new-password", user.password)
+
+
 def test_update_user_without_permission(
     client, token, other_user, mock_valid_updated_user
 ):
@@ -130,3 +273,153 @@ def test_delete_user_without_permission(client, token, other_user):
     assert response.json() == {
         "detail": "You don't have permission to do this"
     }
+
+
+@pytest.mark.asyncio
+async def test_delete_user_with_todos(session, client, user, token):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    response = client.delete(
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not await session.scalar(select(Todo))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["PUT", "DELETE"])
+async def test_write_user_deleted_elsewhere(
+    session, client, user, token, method
+):
+    principal_cache.set(user.username, Principal(user.id, user.username))
+    # Deleted by another worker, whose cache was the only one cleared.
+    await session.execute(delete(User).where(User.id == user.id))
+    await session.commit()
+
+    response = client.request(
+        method,
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "username": user.username,
+            "email": user.email,
+            "password": user.clean_password,
+        },
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert principal_cache.get(user.username) is None
+
+
+@pytest.mark.asyncio
+async def test_delete_user_removes_todo_bookkeeping_on_sqlite(
+    sqlite_client, sqlite_session, mock_valid_user
+):
+    client = sqlite_client
+    user_id = client.post("/users/", json=mock_valid_user).json()["id"]
+    token = client.post(
+        "/auth/token",
+        data={
+            "username": mock_valid_user["username"],
+            "password": mock_valid_user["password"],
+        },
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    todo = client.post(
+        "/todos/",
+        headers=headers,
+        json={"title": "t", "description": "d", "state": "todo"},
+    ).json()
+    client.delete(f"/todos/{todo['id']}", headers=headers)
+
+    response = client.delete(f"/users/{user_id}", headers=headers)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not await sqlite_session.scalar(select(TodoCount))
+    assert not await sqlite_session.scalar(select(TodoTombstone))
+
+
+def test_create_user_does_not_reload_after_insert(
+    client, mock_valid_user, query_counter
+):
+    with query_counter() as counter:
+        response = client.post("/users/", json=mock_valid_user)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(counter.statements) == 1
+    assert counter.statements[-1].startswith("INSERT INTO users")
+    assert "RETURNING" in counter.statements[-1]
+
+
+def test_create_user_rate_limited_per_ip(client, monkeypatch):
+    monkeypatch.setattr(signup_ip_limiter, "burst", 2)
+
+    def signup(i):
+        return client.post(
+            "/users/",
+            json={
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "secret",
+            },
+        )
+
+    signup(1)
+    signup(2)
+
+    async def fail(*args):
+        raise AssertionError("hashed a rate limited signup")
+
+    monkeypatch.setattr(users, "get_password_hash", fail)
+    response = signup(3)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {"detail": "Too many signups"}
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_create_user_detects_duplicates_created_while_hashing(
+    client, session, mock_valid_user, monkeypatch
+):
+    async def hash_during_concurrent_signup(password):
+        session.add(UserFactory(email=mock_valid_user["email"]))
+        await session.commit()
+        return password
+
+    monkeypatch.setattr(
+        users, "get_password_hash", hash_during_concurrent_signup
+    )
+    response = client.post("/users/", json=mock_valid_user)
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json() == {"detail": "Email already exists"}
+
+
+def test_create_user_after_conflict_can_retry(any_client, mock_valid_user):
+    client = any_client
+    client.post("/users/", json=mock_valid_user)
+    client.post("/users/", json=mock_valid_user)
+    mock_valid_user.update(username="bob", email="bob@example.com")
+
+    response = client.post("/users/", json=mock_valid_user)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["username"] == "bob"
+
+
+def test_update_user_does_not_reload_after_update(
+    client, user, token, mock_valid_updated_user, query_counter
+):
+    with query_counter() as counter:
+        response = client.put(
+            f"/users/{user.id}",
+            headers={"Authorization": f"Bearer {token}"},
+            json=mock_valid_updated_user,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert counter.statements[-1].startswith("UPDATE users")
+    assert "RETURNING" in counter.statements[-1]